@@ -1,22 +1,47 @@
+import os
+
 from google.adk.agents.llm_agent import Agent
 from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH
 from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 
 from dotenv import load_dotenv
+from typing import Final
 
 load_dotenv()
 
-weather_agent = RemoteA2aAgent(
-    name='weather_agent',
-    description='An agent that provides weather information for a given location.',
-    agent_card='http://localhost:8002' + AGENT_CARD_WELL_KNOWN_PATH,
-)
+INSTRUCTION: Final[str] = """
+You are a helpful assistant that helps users with various questions.
+Your capabilities include:
+- Providing weather information using the Weather Agent tool.
+- Providing maps and location information using the Maps Agent tool.
+- Answering general knowledge questions.""".strip()
 
-maps_agent = RemoteA2aAgent(
-    name='maps_agent',
-    description='An agent that provides maps and location information.',
-    agent_card='http://localhost:8001' + AGENT_CARD_WELL_KNOWN_PATH,
-)
+if os.getenv("A2A_MODE") == "inproc":
+    # Same-host development: run the sub-agents in this process instead of
+    # going through their A2A servers over localhost HTTP.
+    from maps_agent.agent import root_agent as maps_root_agent
+    from weather_agent.agent import root_agent as weather_root_agent
+
+    weather_agent = weather_root_agent.model_copy(update={
+        "name": "weather_agent",
+        "description": "An agent that provides weather information for a given location.",
+    })
+    maps_agent = maps_root_agent.model_copy(update={
+        "name": "maps_agent",
+        "description": "An agent that provides maps and location information.",
+    })
+else:
+    weather_agent = RemoteA2aAgent(
+        name='weather_agent',
+        description='An agent that provides weather information for a given location.',
+        agent_card='http://localhost:8002' + AGENT_CARD_WELL_KNOWN_PATH,
+    )
+
+    maps_agent = RemoteA2aAgent(
+        name='maps_agent',
+        description='An agent that provides maps and location information.',
+        agent_card='http://localhost:8001' + AGENT_CARD_WELL_KNOWN_PATH,
+    )
 
 # maps_tool = AgentTool(agent=maps_agent)
 # weather_tool = AgentTool(agent=weather_agent)
@@ -26,11 +51,6 @@ root_agent = Agent(
     name='root_agent',
     description='A helpful assistant for user questions.',
     #tools=[maps_tool, weather_tool],
-    instruction="""
-    You are a helpful assistant that helps users with various questions.
-    Your capabilities include:
-    - Providing weather information using the Weather Agent tool.
-    - Providing maps and location information using the Maps Agent tool.
-    - Answering general knowledge questions.""",
+    instruction=INSTRUCTION,
     sub_agents=[weather_agent, maps_agent],
 )
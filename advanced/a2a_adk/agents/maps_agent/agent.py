@@ -1,6 +1,11 @@
+import asyncio
+import json
+import logging
 import os
+from collections import OrderedDict
+from functools import lru_cache
 from google.adk.agents.llm_agent import Agent
-import googlemaps
+import httpx
 from dotenv import load_dotenv, find_dotenv
 from google import genai
 from google.genai import types
@@ -8,29 +13,76 @@ from google.genai import types
 
 load_dotenv(find_dotenv())
 
-print("Initializing Google Maps client...")
-print(os.getenv("GOOGLE_MAPS_API_KEY"))
-gmaps_client = googlemaps.Client(key=os.getenv("GOOGLE_MAPS_API_KEY"))
-genai_client = genai.Client(http_options=types.HttpOptions(api_version="v1"))
+logger = logging.getLogger(__name__)
 
-def get_place_location(place_name: str) -> dict[str, str]:
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+GEOCODE_CACHE_SIZE = 4096
+
+# Normalized place name -> (lat, lng), or None for places Google Maps could not find
+_geocode_cache: OrderedDict[str, tuple[float, float] | None] = OrderedDict()
+
+
+@lru_cache(maxsize=1)
+def _http() -> httpx.AsyncClient:
+    """Create the shared HTTP/2 client for Google Maps requests on first use."""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=10,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    )
+
+
+@lru_cache(maxsize=1)
+def _genai() -> genai.Client:
+    """Create the Gemini client on first use."""
+    return genai.Client(http_options=types.HttpOptions(api_version="v1"))
+
+
+async def _geocode_cached(place_name: str) -> tuple[float, float] | None:
+    """
+    Geocode a normalized place name with the Geocoding REST API, caching the coordinates.
+    Unknown places are cached as None; API errors raise and are not cached.
+    """
+    if place_name in _geocode_cache:
+        _geocode_cache.move_to_end(place_name)
+        return _geocode_cache[place_name]
+
+    response = await _http().get(
+        GEOCODE_URL,
+        params={"address": place_name, "key": os.environ["GOOGLE_MAPS_API_KEY"]},
+    )
+    response.raise_for_status()
+    data = response.json()
+    if data["status"] == "ZERO_RESULTS":
+        coordinates = None
+    elif data["status"] == "OK":
+        location = data["results"][0]["geometry"]["location"]
+        coordinates = location["lat"], location["lng"]
+    else:
+        raise RuntimeError(data.get("error_message", data["status"]))
+
+    _geocode_cache[place_name] = coordinates
+    if len(_geocode_cache) > GEOCODE_CACHE_SIZE:
+        _geocode_cache.popitem(last=False)
+    return coordinates
+
+
+async def get_place_location(place_name: str) -> dict[str, str]:
     """
     Get coordinates from an address using Google Maps API.
     :param place_name: the name of the place to get coordinates for
     :return:
     """
-    """Get coordinates from an address using Google Maps API."""
     try:
-        geocode_result = gmaps_client.geocode(place_name)
-        if geocode_result is None:
+        coordinates = await _geocode_cached(place_name.strip().lower())
+        if coordinates is None:
             return {
                 "status": "error",
                 "message": f"Could not find coordinates for address: {place_name}"
             }
 
-        location = geocode_result[0]["geometry"]["location"]
-        lat = location["lat"]
-        lng = location["lng"]
+        lat, lng = coordinates
         return {
             "status": "success",
             "result": {"latitude": lat, "longitude": lng}
@@ -42,7 +94,24 @@ def get_place_location(place_name: str) -> dict[str, str]:
         }
 
 
-def get_place_details(query_prompt: str, latitude: float, longitude: float) -> str:
+async def get_place_locations(place_names: list[str]) -> list[dict]:
+    """
+    Get coordinates for several places at once using Google Maps API.
+    The geocode requests are issued concurrently, so prefer this tool over
+    get_place_location when more than one place is needed.
+    :param place_names: the names of the places to get coordinates for
+    :return: one result per place, in the same order as place_names
+    """
+    return list(await asyncio.gather(*[get_place_location(name) for name in place_names]))
+
+
+# Static Google Maps grounding tool, shared by every get_place_details call
+MAPS_TOOL = types.Tool(google_maps=types.GoogleMaps(
+    enable_widget=False  # Optional: return Maps widget token
+))
+
+
+async def get_place_details(query_prompt: str, latitude: float, longitude: float) -> str:
     """
     Get place details using Google Maps Tool in Gemini.
     :param query_prompt:
@@ -50,16 +119,14 @@ def get_place_details(query_prompt: str, latitude: float, longitude: float) -> s
     :param longitude:
     :return:
     """
-    response = genai_client.models.generate_content(
+    # Stream the answer so text starts arriving (and is logged) as soon as the
+    # first chunk is generated; the tool result is the concatenated text.
+    chunks = []
+    async for chunk in await _genai().aio.models.generate_content_stream(
         model="gemini-2.5-flash",
         contents=query_prompt,
         config=types.GenerateContentConfig(
-            tools=[
-                # Use Google Maps Tool
-                types.Tool(google_maps=types.GoogleMaps(
-                    enable_widget=False  # Optional: return Maps widget token
-                ))
-            ],
+            tools=[MAPS_TOOL],
             tool_config=types.ToolConfig(
                 retrieval_config=types.RetrievalConfig(
                     lat_lng=types.LatLng(  # Pass geo coordinates for location-aware grounding
@@ -70,14 +137,62 @@ def get_place_details(query_prompt: str, latitude: float, longitude: float) -> s
                 ),
             ),
         ),
+    ):
+        if chunk.text:
+            logger.debug("get_place_details chunk: %s", chunk.text)
+            chunks.append(chunk.text)
+    return "".join(chunks)
+
+
+async def get_place_details_batch(queries: list[dict]) -> list[dict]:
+    """
+    Get place details for several queries with a single Gemini request.
+    Each query is a dict with the keys "query_prompt", "latitude" and "longitude".
+    The queries are combined into one prompt grounded on the centroid of their
+    coordinates, so prefer this tool over get_place_details for nearby places.
+    :param queries: the place detail queries to answer
+    :return: one {"query", "details"} entry per query, in order
+    """
+    if not queries:
+        return []
+    if len(queries) == 1:
+        query = queries[0]
+        details = await get_place_details(query["query_prompt"], query["latitude"], query["longitude"])
+        return [{"query": query["query_prompt"], "details": details}]
+
+    numbered = "\n".join(
+        f"{i}. {query['query_prompt']} (near {query['latitude']}, {query['longitude']})"
+        for i, query in enumerate(queries, start=1)
+    )
+    prompt = (
+        f"Return a JSON array with exactly {len(queries)} objects, each with the keys "
+        f'"query" and "details". For each of the following {len(queries)} queries '
+        f"give place details:\n{numbered}"
     )
-    return response.text
+    latitude = sum(query["latitude"] for query in queries) / len(queries)
+    longitude = sum(query["longitude"] for query in queries) / len(queries)
+    text = await get_place_details(prompt, latitude, longitude)
+    # Grounding tools cannot be combined with a JSON response mime type, so
+    # the array may come back wrapped in a markdown code fence.
+    start, end = text.find("["), text.rfind("]")
+    try:
+        results = json.loads(text[start:end + 1])
+    except ValueError:
+        results = None
+    # Only trust the array if it has one {"query", "details"} object per query
+    if (
+        isinstance(results, list)
+        and len(results) == len(queries)
+        and all(isinstance(result, dict) and "details" in result for result in results)
+    ):
+        return results
+    return [{"query": query["query_prompt"], "details": text} for query in queries]
 
 root_agent = Agent(
     model='gemini-2.5-flash',
     name='root_agent',
     description='A helpful assistant for user interact with google maps',
-    tools=[get_place_location, get_place_details],
+    tools=[get_place_location, get_place_locations, get_place_details, get_place_details_batch],
     instruction="""
     You are a helpful assistant that enables users to interact effectively with Google Maps.
     Your capabilities include:
@@ -86,8 +201,10 @@ root_agent = Agent(
     
     Tools:
     - get_place_location: Use this tool to obtain the latitude and longitude of a specified place.
+    - get_place_locations: Use this tool to obtain the latitude and longitude of several places at once.
     - get_place_details: Use this tool to fetch detailed information about a place using its coordinates, including 
     general information, reviews, and nearby points of interest.
+    - get_place_details_batch: Use this tool to fetch details for several places in a single request.
     
     """
 )
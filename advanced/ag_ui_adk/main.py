@@ -1,3 +1,8 @@
+import contextlib
+import os
+from collections.abc import AsyncIterator
+from typing import Final
+
 from fastapi import FastAPI
 from ag_ui_adk import ADKAgent, add_adk_fastapi_endpoint
 from google.adk import Agent
@@ -5,18 +10,18 @@ from dotenv import load_dotenv
 from google.adk.tools import MCPToolset
 from google.adk.tools.mcp_tool import StreamableHTTPConnectionParams
 from google.adk.tools.preload_memory_tool import PreloadMemoryTool
-from tools import get_weather, get_place_location, get_place_details
+from tools import get_weather, get_place_location, get_place_details, get_http_client, close_http_client, geocode_batcher
 import logging
 
-# Initialize logger for debugging
+# Initialize logger; set LOG_LEVEL=DEBUG for detailed output
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 
 # Load environment variables from .env file
 load_dotenv()
 
 
-agent_instructions = """
+INSTRUCTION: Final[str] = """
 You are a helpful assistant designed to answer user questions and provide useful information, 
 including weather updates and place details using Google Maps data.
 
@@ -31,30 +36,28 @@ Tool Usage:
 - get_place_details: Fetch detailed information about a place using its geographic coordinates.
 
 Always choose the most appropriate tool to fulfill the user's request, and respond clearly and concisely.
-"""
+""".strip()
 # -------------------------------------------------------------------
 # Create a base Google ADK agent definition
 # This is the core LLM agent that will power the application
 # -------------------------------------------------------------------
-weather_agent = Agent(
+# Static tools, built once at import; the MCP Toolset is attached per worker
+# process in the app lifespan
+TOOLS: Final[tuple] = (
+    # Provides persistent memory during the session (non-long-term)
+    PreloadMemoryTool(),
+
+    # Direct tool integration example
+    # get_weather,
+    get_place_location,
+    get_place_details,
+)
+
+weather_agent: Final[Agent] = Agent(
     name="assistant",                    # Internal agent name
     model="gemini-2.5-flash",            # LLM model to use
-    instruction=agent_instructions,
-    tools=[
-        # Provides persistent memory during the session (non-long-term)
-        PreloadMemoryTool(),
-
-        # Direct tool integration example
-        # get_weather,
-        get_place_location,
-        get_place_details,
-        # MCP Toolset integration
-        MCPToolset(
-            connection_params=StreamableHTTPConnectionParams(
-                url="http://127.0.0.1:8080/mcp"   # Local MCP server endpoint
-            )
-        )
-    ]
+    instruction=INSTRUCTION,
+    tools=list(TOOLS),
 )
 
 # -------------------------------------------------------------------
@@ -62,7 +65,7 @@ weather_agent = Agent(
 # This provides sessions, user identity, in-memory services,
 # and the unified ADK API that frontend UI components expect.
 # -------------------------------------------------------------------
-ag_weather_agent = ADKAgent(
+ag_weather_agent: Final[ADKAgent] = ADKAgent(
     adk_agent=weather_agent,            # The core ADK agent
     app_name="demo_app",                # App identifier
     user_id="demo_user",                # Mock user ID (replace in production)
@@ -70,8 +73,30 @@ ag_weather_agent = ADKAgent(
     use_in_memory_services=True         # Enables in-memory RAG + storage
 )
 
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open per-process clients on startup and close them on shutdown."""
+    app.state.http = get_http_client()
+    geocode_batcher.start()
+    # MCP Toolset integration. The toolset holds live MCP sessions, so each
+    # worker process owns its own instance instead of sharing one from import time.
+    app.state.mcp = MCPToolset(
+        connection_params=StreamableHTTPConnectionParams(
+            url="http://127.0.0.1:8080/mcp"   # Local MCP server endpoint
+        )
+    )
+    weather_agent.tools.append(app.state.mcp)
+    try:
+        yield
+    finally:
+        weather_agent.tools.remove(app.state.mcp)
+        await app.state.mcp.close()
+        await geocode_batcher.stop()
+        await close_http_client()
+
+
 # Create the FastAPI application
-app = FastAPI(title="ADK Middleware Basic Chat")
+app = FastAPI(title="ADK Middleware Basic Chat", lifespan=lifespan)
 
 # -------------------------------------------------------------------
 # Register an ADK-compliant endpoint with FastAPI.
@@ -90,6 +115,9 @@ if __name__ == '__main__':
         "main:app",
         host="localhost",
         port=8000,
-        reload=True,        # Auto-reload on code changes
-        workers=1           # Single worker recommended for MCP tools
+        loop="uvloop",      # libuv-based event loop
+        http="httptools",   # C HTTP parser
+        # Worker count comes from WEB_CONCURRENCY; auto-reload only works with a single process.
+        # Sessions are kept in memory per worker, so use sticky routing with several workers.
+        reload="WEB_CONCURRENCY" not in os.environ,
     )
@@ -1,6 +1,6 @@
+import asyncio
 import os
 
-import googlemaps
 import httpx
 from google import genai
 from google.genai import types
@@ -9,9 +9,34 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 
 
-gmaps_client = googlemaps.Client(key=os.getenv("GOOGLE_MAPS_API_KEY"))
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
 genai_client = genai.Client(http_options=types.HttpOptions(api_version="v1"))
 
+# Shared HTTP/2 client so Google Maps calls reuse pooled keep-alive connections
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client, if it was created."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 def get_weather_condition(code: int) -> str:
     """Map weather code to human-readable condition.
 
@@ -106,16 +131,16 @@ async def get_weather(location: str) -> dict:
         return result
 
 
-def get_place_location(place_name: str) -> dict[str, str]:
-    """
-    Get coordinates from an address using Google Maps API.
-    :param place_name: the name of the place to get coordinates for
-    :return:
-    """
-    """Get coordinates from an address using Google Maps API."""
+async def _geocode(place_name: str) -> dict[str, str]:
+    """Geocode a single place with the Geocoding REST API."""
     try:
-        geocode_result = gmaps_client.geocode(place_name)
-        if geocode_result is None:
+        response = await get_http_client().get(
+            GEOCODE_URL,
+            params={"address": place_name, "key": os.getenv("GOOGLE_MAPS_API_KEY")},
+        )
+        response.raise_for_status()
+        geocode_result = response.json().get("results")
+        if not geocode_result:
             return {
                 "status": "error",
                 "message": f"Could not find coordinates for address: {place_name}"
@@ -135,6 +160,114 @@ def get_place_location(place_name: str) -> dict[str, str]:
         }
 
 
+class GeocodeBatcher:
+    """
+    Coalesces geocoding requests that arrive within a short window.
+
+    Requests are queued and a background task drains up to ``max_batch`` of them,
+    waiting up to ``window`` seconds for more only when others are already queued,
+    geocoding each distinct place name once and dispatching the batch concurrently
+    over the shared HTTP/2 connection.
+    """
+
+    def __init__(self, window: float = 0.05, max_batch: int = 10):
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future]] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        # Batch being geocoded, so stop() can fail its futures
+        self._batch: list[tuple[str, asyncio.Future]] = []
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background consumer on the running event loop."""
+        if not self.running:
+            self._task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        """Stop the background consumer and fail every request it has not answered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        pending = self._batch
+        self._batch = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Geocoding stopped before the request was answered."))
+
+    async def geocode(self, place_name: str) -> dict[str, str]:
+        """Queue a geocoding request and wait for its batch to complete."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((place_name, future))
+        return await future
+
+    async def _next_batch(self) -> list[tuple[str, asyncio.Future]]:
+        # Collected into self._batch, so stop() can fail the requests taken so far
+        self._batch = batch = [await self._queue.get()]
+        # A lone request is dispatched at once; the window only applies when others are queued
+        if self._queue.empty():
+            return batch
+        deadline = asyncio.get_running_loop().time() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _consume(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            names = list(dict.fromkeys(name for name, _ in batch))
+            # One failed lookup must not kill the consumer or leave the other callers waiting
+            results = dict(zip(names, await asyncio.gather(
+                *[_geocode(name) for name in names], return_exceptions=True
+            )))
+            for name, future in batch:
+                if future.done():
+                    continue
+                result = results[name]
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            self._batch = []
+
+
+# Started and stopped by the FastAPI lifespan in main.py
+geocode_batcher = GeocodeBatcher()
+
+
+async def get_place_location(place_name: str) -> dict[str, str]:
+    """
+    Get coordinates from an address using Google Maps API.
+    :param place_name: the name of the place to get coordinates for
+    :return:
+    """
+    if geocode_batcher.running:
+        return await geocode_batcher.geocode(place_name)
+    return await _geocode(place_name)
+
+
+# Static Google Maps grounding tool, shared by every get_place_details call
+MAPS_TOOL = types.Tool(google_maps=types.GoogleMaps(
+    enable_widget=False  # Optional: return Maps widget token
+))
+
+
 def get_place_details(query_prompt: str, latitude: float, longitude: float) -> str:
     """
     Get place details using Google Maps Tool in Gemini.
@@ -147,12 +280,7 @@ def get_place_details(query_prompt: str, latitude: float, longitude: float) -> s
         model="gemini-2.5-flash",
         contents=query_prompt,
         config=types.GenerateContentConfig(
-            tools=[
-                # Use Google Maps Tool
-                types.Tool(google_maps=types.GoogleMaps(
-                    enable_widget=False  # Optional: return Maps widget token
-                ))
-            ],
+            tools=[MAPS_TOOL],
             tool_config=types.ToolConfig(
                 retrieval_config=types.RetrievalConfig(
                     lat_lng=types.LatLng(  # Pass geo coordinates for location-aware grounding
@@ -1,10 +1,11 @@
 import contextlib
-import json
 import logging
+import os
 from collections.abc import AsyncIterator
 from typing import Any
 
 import mcp.types as types
+import orjson
 from mcp.server.lowlevel import Server
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 from starlette.applications import Starlette
@@ -13,6 +14,24 @@ from starlette.types import Receive, Scope, Send
 
 from tools import get_weather
 
+# Tool definitions are static, so build them once and reuse them for every discovery call
+TOOLS: list[types.Tool] = [
+    types.Tool(
+        name="get_weather",
+        description="Get the weather for a given location.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "location to get the weather for"
+                }
+            },
+            "required": ["location"]
+        }
+    )
+]
+
 
 def create_mcp_server():
     """Create and configure the MCP server."""
@@ -27,7 +46,7 @@ def create_mcp_server():
             # Simulate fetching weather data (replace with real API call)
             result = await get_weather(location)
             # convert to json serializable format
-            result = json.dumps(result, indent=2)
+            result = orjson.dumps(result).decode()
             return [
                 types.TextContent(
                     type="text",
@@ -40,30 +59,12 @@ def create_mcp_server():
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
         """List available tools."""
-        return [
-            types.Tool(
-                name="get_weather",
-                description="Get the weather for a given location.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "location": {
-                            "type": "string",
-                            "description": "location to get the weather for"
-                        }
-                    },
-                    "required": ["location"]
-                }
-            )
-        ]
+        return TOOLS
 
     return app
 
-def main(port: int = 8080, json_response: bool = False):
-    """Main server function."""
-    logging.basicConfig(level=logging.DEBUG)
-    logger = logging.getLogger("mcp_server")
-
+def create_starlette_app(json_response: bool = False) -> Starlette:
+    """Create the ASGI application serving the MCP server over streamable HTTP."""
     app = create_mcp_server()
 
     # Create session manager with stateless mode for scalability
@@ -88,7 +89,7 @@ def main(port: int = 8080, json_response: bool = False):
                 logger.info("MCP server shutting down...")
 
     # Create ASGI application
-    starlette_app = Starlette(
+    return Starlette(
         debug=False,  # Set to False for production
         routes=[
             Mount("/mcp", app=handle_streamable_http),
@@ -96,8 +97,34 @@ def main(port: int = 8080, json_response: bool = False):
         lifespan=lifespan,
     )
 
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger("mcp_server")
+
+# Module-level app so uvicorn workers can import it by name
+starlette_app = create_starlette_app()
+
+
+def main(port: int = 8080, json_response: bool = False, workers: int | None = None):
+    """Main server function."""
     import uvicorn
-    uvicorn.run(starlette_app, host="0.0.0.0", port=port)
+
+    if json_response:
+        # Worker processes import the default app, so a custom configuration
+        # has to be served from this process
+        uvicorn.run(create_starlette_app(json_response=True), host="0.0.0.0", port=port,
+                    loop="uvloop", http="httptools")
+        return
+
+    # The server is stateless, so requests can be spread across worker processes
+    uvicorn.run(
+        "weather_mcp_server:starlette_app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers or min(4, os.cpu_count() or 1),
+        loop="uvloop",
+        http="httptools",
+    )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,9 @@
 import asyncio
+import time
 import uvicorn
 import argparse
 from typing import Dict, List, Any
+import msgspec
 from fastmcp import FastMCP, Context
 from fastmcp.server.http import create_streamable_http_app
 import logging
@@ -16,6 +18,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Minimum time between progress notifications, so fast loops don't flood the MCP channel
+PROGRESS_INTERVAL = 0.1
+
+
+class UploadedFile(msgspec.Struct):
+    """A simulated uploaded file, as reported by file_upload_simulation."""
+    name: str
+    size: str
+    status: str
+
 
 # Create MCP server instance
 mcp = FastMCP(
@@ -50,6 +62,7 @@ async def long_running_task(
         await context.info(f"🚀 Initializing '{name}' with {steps} steps...")
 
     results = []
+    last_report = time.monotonic()
 
     for i in range(steps):
         # Simulate work
@@ -59,8 +72,11 @@ async def long_running_task(
         step_result = f"Processed item {i + 1} for '{name}'"
         results.append(step_result)
 
-        # Report progress back to the client via the context
-        if context:
+        # Report progress back to the client via the context, throttled
+        # to one notification per PROGRESS_INTERVAL (the last step always reports)
+        now = time.monotonic()
+        if context and (now - last_report > PROGRESS_INTERVAL or i == steps - 1):
+            last_report = now
             await context.report_progress(
                 progress=i + 1,
                 total=steps,
@@ -97,6 +113,7 @@ async def file_upload_simulation(
         await context.info(f"📤 Starting upload of {file_count} files...")
 
     uploaded_files = []
+    total_size = 0
 
     for i in range(file_count):
         file_name = f"file_{i + 1}.dat"
@@ -104,23 +121,27 @@ async def file_upload_simulation(
         if context:
             await context.info(f"Uploading {file_name}...")
 
-        # Simulate upload by chunks
+        # Simulate upload by chunks, sent concurrently like a real pipelined upload
         chunks = 10
-        for chunk in range(chunks):
-            await asyncio.sleep(0.2)  # Simulate upload time
-
-            if context:
-                await context.report_progress(
-                    progress=(i * chunks) + chunk + 1,
-                    total=file_count * chunks,
-                    message=f"Uploading {file_name} - chunk {chunk + 1}/{chunks}"
-                )
-
-        uploaded_files.append({
-            "name": file_name,
-            "size": f"{(i + 1) * 1024} KB",
-            "status": "uploaded"
-        })
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(chunks):
+                tg.create_task(asyncio.sleep(0.2))  # Simulate upload time
+
+        # Progress is reported per file rather than per chunk
+        if context:
+            await context.report_progress(
+                progress=(i + 1) * chunks,
+                total=file_count * chunks,
+                message=f"Uploaded {file_name} ({chunks} chunks)"
+            )
+
+        size_kb = (i + 1) * 1024
+        total_size += size_kb
+        uploaded_files.append(UploadedFile(
+            name=file_name,
+            size=f"{size_kb} KB",
+            status="uploaded",
+        ))
 
         if context:
             await context.debug(f"✅ {file_name} uploaded successfully")
@@ -130,8 +151,8 @@ async def file_upload_simulation(
 
     return {
         "uploaded_count": len(uploaded_files),
-        "files": uploaded_files,
-        "total_size": sum(int(f["size"].split()[0]) for f in uploaded_files),
+        "files": msgspec.to_builtins(uploaded_files),
+        "total_size": total_size,
         "status": "completed"
     }
 
@@ -1,13 +1,11 @@
-import abc
 import asyncio
+import collections
 import inspect
-import json
 import logging
 import time
-from abc import ABCMeta
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List, Dict, Union, Any, Callable, Literal
+from typing import Optional, List, Dict, Union, Any, Callable, Literal, Tuple, ClassVar, Protocol, Sequence
 
 from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from fastmcp.client.elicitation import ElicitResult
@@ -18,46 +16,116 @@ from mcp.client.stdio import stdio_client
 from mcp.client.streamable_http import streamablehttp_client
 from mcp.shared.context import RequestContext
 from mcp.types import CallToolResult
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from utils import mcp_tools_to_gemini
 
+try:
+    # orjson parses several times faster than the stdlib; it is optional
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Subscriber dispatch kinds, resolved once at subscribe time
+_ASYNC_SUBSCRIBER = 0
+_SYNC_SUBSCRIBER = 1
+
+
 class AsyncMessageBus:
     """A simple asynchronous message bus for event subscription and broadcasting."""
-    def __init__(self):
-        self._subscribers: List[Callable] = []
+    def __init__(self, single_responder: bool = False):
+        # callback -> (dispatch kind, callback); an insertion-ordered set with O(1) removal
+        self._subscribers: Dict[Callable, Tuple[int, Callable]] = {}
+        # Request/response buses (elicitation, sampling) expect exactly one reply,
+        # so they return the first subscriber's result instead of fanning out
+        self._solo = single_responder
+
+    @staticmethod
+    def _classify(callback: Callable) -> int:
+        """Determine once whether a subscriber must be awaited."""
+        if not callable(callback):
+            raise TypeError(f"Subscriber {callback} is not callable")
+        # Async function, or class instance with async __call__
+        if inspect.iscoroutinefunction(callback) or inspect.iscoroutinefunction(getattr(callback, "__call__", None)):
+            return _ASYNC_SUBSCRIBER
+        return _SYNC_SUBSCRIBER
 
     def subscribe(self, callback: Callable):
-        """Register a new subscriber."""
+        """
+        Register a new subscriber.
+
+        Subscribers that need awaiting must be coroutine functions (or objects
+        with an async ``__call__``); anything else is called synchronously and its
+        return value used as-is, so wrap coroutine-returning callables in ``async def``.
+        """
         if callback not in self._subscribers:
-            self._subscribers.append(callback)
+            self._subscribers[callback] = (self._classify(callback), callback)
 
     def unsubscribe(self, callback: Callable):
         """Unregister a subscriber."""
-        self._subscribers.remove(callback)
+        self._subscribers.pop(callback, None)
+
+    def __len__(self) -> int:
+        """Number of subscribers; an empty bus is falsy, so callers can skip broadcasting."""
+        return len(self._subscribers)
 
     async def broadcast(self, *args: Any, **kwargs: Any):
-        """Broadcast a message to all subscribers."""
-        for callback in self._subscribers:
-            # Case 1: async function
-            if inspect.iscoroutinefunction(callback):
-                return await callback(*args, **kwargs)
-
-            # Case 2: class instance with async __call__
-            elif callable(callback) and inspect.iscoroutinefunction(getattr(callback, "__call__", None)):
-                return await callback(*args, **kwargs)
-
-            # Case 3: sync callable — run in threadpool if needed
-            elif callable(callback):
-                result = callback(*args, **kwargs)
-                if inspect.isawaitable(result):
-                    return await result  # handles generators returning coroutines
+        """
+        Broadcast a message to all subscribers.
+
+        Async subscribers are awaited concurrently; exceptions they raise are
+        returned in place of their result. Returns the list of results, or the
+        first subscriber's result for a single-responder bus.
+        """
+        if not self._subscribers:
+            return None if self._solo else []
+
+        if self._solo:
+            for kind, callback in self._subscribers.values():
+                if kind == _ASYNC_SUBSCRIBER:
+                    return await callback(*args, **kwargs)
+                return callback(*args, **kwargs)
+            return None
+
+        results = []
+        pending = []
+        for kind, callback in self._subscribers.values():
+            if kind == _ASYNC_SUBSCRIBER:
+                pending.append(callback(*args, **kwargs))
             else:
-                raise TypeError(f"Subscriber {callback} is not callable")
+                results.append(callback(*args, **kwargs))
+
+        if pending:
+            results.extend(await asyncio.gather(*pending, return_exceptions=True))
+        return results
+
 
 
+class LazyMessageBus:
+    """
+    Descriptor that allocates an AsyncMessageBus on first access.
+
+    The bus is stored on the instance under ``_<name>``, which stays ``None``
+    until something subscribes, so handlers can skip broadcasting cheaply.
+    """
+    def __init__(self, single_responder: bool = False):
+        self._single_responder = single_responder
+        self._attr = ""
+
+    def __set_name__(self, owner, name: str):
+        self._attr = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        bus = getattr(instance, self._attr, None)
+        if bus is None:
+            bus = AsyncMessageBus(single_responder=self._single_responder)
+            setattr(instance, self._attr, bus)
+        return bus
+
 
 class ProgressUpdate(BaseModel): # No change, but moved for logical grouping
     """Represents a progress update."""
@@ -65,7 +133,8 @@ class ProgressUpdate(BaseModel): # No change, but moved for logical grouping
     total: float
     message: str
     percentage: float
-    timestamp: datetime = datetime.now()
+    # Taken per instance; a plain datetime default would be evaluated once at import
+    timestamp: datetime = Field(default_factory=datetime.now)
 
 
 class ToolResult(BaseModel):
@@ -76,81 +145,118 @@ class ToolResult(BaseModel):
     progress_updates: Optional[List[ProgressUpdate]] = []
     duration: Optional[float]  = None  # Duration in seconds
 
-class MCPClient(metaclass=ABCMeta):
+class ProgressTracker(Protocol):
+    """A progress callback that also records the updates it receives."""
+    progress_updates: Sequence[ProgressUpdate]
+
+    async def __call__(self, progress: float, total: float, message: str) -> None:
+        ...
+
+    def reset(self) -> None:
+        """Forgets earlier updates so a new execution starts from a clean slate."""
+        ...
+
+
+# Shared stand-in for callbacks that don't record updates; never mutated
+_EMPTY_PROGRESS: Tuple[ProgressUpdate, ...] = ()
+
+
+def _start_progress(progress_callback: Optional[Callable]) -> Sequence[ProgressUpdate]:
+    """Resets a ProgressTracker and returns its recorded updates, or an empty tuple otherwise."""
+    try:
+        progress_callback.reset()
+        return progress_callback.progress_updates
+    except AttributeError:  # None, or a plain callable
+        return _EMPTY_PROGRESS
+
+
+class MCPClient(Protocol):
     """
-    Abstract Base Class for MCP clients, defining a common interface for connecting,
+    Protocol for MCP clients, defining a common interface for connecting,
     executing tools, and managing the client lifecycle.
     """
-    @abc.abstractmethod
+    __slots__ = ()
+
     async def connect_to_server(self) -> None:
-        raise NotImplementedError
+        ...
 
-    @abc.abstractmethod
     async def get_tools(self) -> List[Tool]:
-        raise NotImplementedError
+        ...
 
-    @abc.abstractmethod
     async def close(self) -> None:
-        raise NotImplementedError
+        ...
 
-    @abc.abstractmethod
     async def execute_tool(self, tool_name: str, tool_args: Dict[str, Any], progress_callback: Optional[Callable] = None) -> ToolResult:
-        raise NotImplementedError
+        ...
 
-    @abc.abstractmethod
     async def get_tools_for_gemini(self) -> List[types.Tool]:
-        raise NotImplementedError
+        ...
 
-    @abc.abstractmethod
     def subscribe(self, callback):
-        raise NotImplementedError
+        ...
 
-    @abc.abstractmethod
     def subscribe_elicitation(self, callback):
-        raise NotImplementedError
+        ...
 
-    @abc.abstractmethod
     def subscribe_sampling(self, callback):
-        raise NotImplementedError
+        ...
 
 
-class _BaseMCPClient(MCPClient, metaclass=ABCMeta):
+class _BaseMCPClient(MCPClient):
     """
     Internal base class to handle common MCP client connection lifecycle logic,
-    including task management and ready/shutdown events.
+    including task management and the ready/shutdown handshake.
     """
+    # Slots give fast attribute access on the per-call paths (session, tasks, caches)
+    __slots__ = (
+        '_client_task', '_ready_future', '_shutdown_event', 'session', '_connected',
+        '_tools_cache', '_gemini_tools_cache', 'reader', 'writer',
+        '_message_bus', '_elicitation_bus', '_sampling_bus',
+    )
+    message_bus = LazyMessageBus()
+    elicitation_bus = LazyMessageBus(single_responder=True)
+    sampling_bus = LazyMessageBus(single_responder=True)
+
     def __init__(self):
         # Async task that runs the client session loop
         self._client_task: Optional[asyncio.Task] = None
-        # Event to signal when session is ready or has failed
-        self._session_ready_event = asyncio.Event()
+        # Resolved when the session is ready, or failed with the startup exception
+        self._ready_future: Optional[asyncio.Future] = None
         # Event to trigger client shutdown
         self._shutdown_event = asyncio.Event()
         # MCP session
         self.session: Optional[ClientSession] = None
-        # Status flags and exception tracking
+        # Status flag
         self._connected: bool = False
-        self._startup_exception: Optional[Exception] = None
+        # Tools listed by the server, cached for the lifetime of the session
+        self._tools_cache: Optional[List[Tool]] = None
+        self._gemini_tools_cache: Optional[List[types.Tool]] = None
 
         self.reader: Optional[asyncio.StreamReader | MemoryObjectReceiveStream] = None
         self.writer: Optional[asyncio.StreamWriter | MemoryObjectSendStream] = None
-        self.message_bus = AsyncMessageBus()
-        self.elicitation_bus = AsyncMessageBus()
-        self.sampling_bus = AsyncMessageBus()
+        # Message buses, allocated on first subscription (see LazyMessageBus)
+        self._message_bus: Optional[AsyncMessageBus] = None
+        self._elicitation_bus: Optional[AsyncMessageBus] = None
+        self._sampling_bus: Optional[AsyncMessageBus] = None
 
     async def _internal_message_handler(self, message: Any):
         """Internal handler to broadcast messages to subscribers."""
-        await self.message_bus.broadcast(message)
+        if self._message_bus:
+            await self._message_bus.broadcast(message)
 
     async def _internal_elicitation_handler(self, context: RequestContext["ClientSession", Any],
                                   params: mcp_types.ElicitRequestParams) -> mcp_types.ElicitResult | mcp_types.ErrorData:
         """Internal handler to broadcast elicitation messages to subscribers."""
-        return await self.elicitation_bus.broadcast(context, params)
+        if not self._elicitation_bus:
+            return None
+        return await self._elicitation_bus.broadcast(context, params)
 
     async def _internal_sampling_handler(self, context: RequestContext["ClientSession", Any],
                                   params: mcp_types.CreateMessageRequestParams) -> mcp_types.CreateMessageResult | mcp_types.ErrorData:
         """Internal handler to broadcast sampling messages to subscribers."""
-        return await self.sampling_bus.broadcast(context, params)
+        if not self._sampling_bus:
+            return None
+        return await self._sampling_bus.broadcast(context, params)
 
     def subscribe(self, callback: Callable):
         self.message_bus.subscribe(callback)
@@ -177,15 +283,12 @@ class _BaseMCPClient(MCPClient, metaclass=ABCMeta):
             logger.warning("Client is already connected or connecting.")
             return
 
-        self._startup_exception = None
-        self._session_ready_event.clear()
+        self._ready_future = asyncio.get_running_loop().create_future()
         self._shutdown_event.clear()
 
         self._client_task = asyncio.create_task(self._run_client_session_wrapper())
-        await self._session_ready_event.wait()
-
-        if self._startup_exception:
-            raise self._startup_exception
+        # Raises the startup exception if the session failed to initialize
+        await self._ready_future
 
     async def _run_client_session_wrapper(self):
         """
@@ -195,16 +298,18 @@ class _BaseMCPClient(MCPClient, metaclass=ABCMeta):
             await self._run_session()
         except Exception as e:
             logger.exception("Failed to initialize or run MCP session.")
-            self._startup_exception = e
+            if not self._ready_future.done():
+                self._ready_future.set_exception(e)
         finally:
             self._connected = False
             self.session = None
-            # Ensure ready event is set in case of failure during startup
-            if not self._session_ready_event.is_set():
-                self._session_ready_event.set()
+            self._tools_cache = None
+            self._gemini_tools_cache = None
+            # Ensure the waiter is released if the session ended during startup
+            if not self._ready_future.done():
+                self._ready_future.set_result(None)
             logger.info("Client session has been closed.")
 
-    @abc.abstractmethod
     async def _run_session(self):
         """Subclasses must implement this to establish and manage the session."""
         raise NotImplementedError
@@ -223,27 +328,34 @@ class _BaseMCPClient(MCPClient, metaclass=ABCMeta):
     async def get_tools(self) -> List[Tool]:
         """
         Returns a list of available tools with their details from the connected MCP server.
+        The list is fetched once per session.
         """
         if not self.session:
             raise RuntimeError("Session is not initialized. Call connect_to_server() first.")
-        response = await self.session.list_tools()
-        return response.tools
+        if self._tools_cache is None:
+            response = await self.session.list_tools()
+            self._tools_cache = response.tools
+        return self._tools_cache
 
     async def get_tools_for_gemini(self) -> List[types.Tool]:
         """
         Converts MCP tools into Gemini-compatible Tool objects.
+        The conversion is done once per session.
         """
-        if not self.session:
-            raise RuntimeError("Session is not initialized. Call connect_to_server() first.")
-
-        mcp_tools_result = await self.session.list_tools()
-        return mcp_tools_to_gemini(mcp_tools_result.tools)
+        if self._gemini_tools_cache is None:
+            self._gemini_tools_cache = mcp_tools_to_gemini(await self.get_tools())
+        return self._gemini_tools_cache
 
 
 class MCPStdioClient(_BaseMCPClient):
     """
     Handles the lifecycle and communication with a single MCP server over stdio.
     """
+    __slots__ = ('_server_params',)
+
+    # Shared "meta" argument sent with every tool call; never mutated
+    _META_JSON: ClassVar[Dict[str, str]] = {"data_format": "json"}
+
     def __init__(self,
                  server_params: Optional[StdioServerParameters] = None,
                  ):
@@ -267,20 +379,16 @@ class MCPStdioClient(_BaseMCPClient):
         if not self.session:
             raise RuntimeError("Session is not initialized. Call connect_to_server() first.")
 
-        start_time = time.monotonic()
+        start_time = time.perf_counter()
         try:
             response = await self.session.call_tool(
                 tool_name,
-                arguments={
-                    **tool_args,
-                    "meta": {
-                        "data_format": "json"
-                    }
-                }
+                arguments={**tool_args, "meta": self._META_JSON}
             )
-            duration = time.monotonic() - start_time
+            duration = time.perf_counter() - start_time
             result_text = response.content[0].text
-            return ToolResult(
+            # Fields are built here, so skip validation on the success path
+            return ToolResult.model_construct(
                 name=tool_name,
                 result={"output": result_text},
                 progress_updates=[],  # Stdio doesn't support progress
@@ -289,8 +397,8 @@ class MCPStdioClient(_BaseMCPClient):
 
             )
         except Exception as e:
-            logger.error(f"Failed to execute tool '{tool_name}': {e}")
-            duration = time.monotonic() - start_time
+            logger.error("Failed to execute tool '%s': %s", tool_name, e)
+            duration = time.perf_counter() - start_time
             return ToolResult(
                 name=tool_name,
                 result=str(e),
@@ -316,7 +424,7 @@ class MCPStdioClient(_BaseMCPClient):
         ))
 
     async def _run_session(self):
-        logger.info(f"MCPStdioClient session started with command: {self._server_params.command} {self._server_params.args}")
+        logger.info("MCPStdioClient session started with command: %s %s", self._server_params.command, self._server_params.args)
         """Main async task that handles connection, initialization, and lifecycle management."""
         async with stdio_client(self._server_params) as (reader, writer):
             self.reader = reader
@@ -332,12 +440,13 @@ class MCPStdioClient(_BaseMCPClient):
                 await session.initialize()
                 self.session = session
                 self._connected = True
-                self._session_ready_event.set()
+                self._ready_future.set_result(None)
                 await self._shutdown_event.wait()
 
 
 class MCPStreamableHttpClient(_BaseMCPClient):
     """MCP client with streaming capabilities."""
+    __slots__ = ('_server_url', '_sse_read_timeout', '_timeout')
 
     def __init__(self,
                  server_url: str,
@@ -353,7 +462,7 @@ class MCPStreamableHttpClient(_BaseMCPClient):
 
 
     async def _run_session(self):
-        logger.info(f"Connecting to MCP server at {self._server_url} with timeout {self._timeout} and SSE read timeout {self._sse_read_timeout}")
+        logger.info("Connecting to MCP server at %s with timeout %s and SSE read timeout %s", self._server_url, self._timeout, self._sse_read_timeout)
         async with streamablehttp_client(
                 self._server_url,
                 timeout=self._timeout,
@@ -370,15 +479,15 @@ class MCPStreamableHttpClient(_BaseMCPClient):
 
                 ) as session:
                     result = await session.initialize()
-                    logger.info(f"Connected to: {result.serverInfo.name}")
-                    logger.info(f"Protocol: {result.protocolVersion}")
+                    logger.info("Connected to: %s", result.serverInfo.name)
+                    logger.info("Protocol: %s", result.protocolVersion)
                     current_session_id = get_session_id()
                     if current_session_id:
-                        logger.info(f"Current session ID: {current_session_id}")
+                        logger.info("Current session ID: %s", current_session_id)
 
                     self.session = session
                     self._connected = True
-                    self._session_ready_event.set()
+                    self._ready_future.set_result(None)
                     await self._shutdown_event.wait()
 
     async def execute_tool(self, tool_name: str, tool_args: Dict[str, Any], progress_callback: Optional[Callable] = None) -> ToolResult:
@@ -389,40 +498,41 @@ class MCPStreamableHttpClient(_BaseMCPClient):
             tool_name (str): The name of the tool to execute.
             tool_args (Dict): Arguments to pass to the tool.
             progress_callback (Callable, optional): Callback function to handle progress updates.
+                If it is a ProgressTracker, it is reset and its recorded updates are included in the result.
 
         Returns:
             ToolResult: An object containing the result and metadata of the task execution.
         """
         if not self.session:
             raise RuntimeError("Session is not initialized. Call connect_to_server() first.")
-        start_time = time.monotonic()
+        progress_updates = _start_progress(progress_callback)
+        start_time = time.perf_counter()
         try:
             result = await self.session.call_tool(
                 tool_name,
-                arguments={
-                    **tool_args
-                },
+                arguments=tool_args,  # call_tool only serializes the arguments
                 progress_callback=progress_callback
             )
-            duration = time.monotonic() - start_time
+            duration = time.perf_counter() - start_time
             content = getattr(result, 'content', result)
             result_dict = self._process_tool_output(content)
 
-            return ToolResult(
+            # Fields are built here, so skip validation on the success path
+            return ToolResult.model_construct(
                 name=tool_name,
                 result=result_dict,
-                progress_updates=getattr(progress_callback, 'progress_updates', []),
+                progress_updates=list(progress_updates),
                 duration=duration,
                 status="success"
             )
         except Exception as e:
-            logger.error(f"Failed to execute tool '{tool_name}': {e}")
-            duration = time.monotonic() - start_time
+            logger.error("Failed to execute tool '%s': %s", tool_name, e)
+            duration = time.perf_counter() - start_time
 
             return ToolResult(
                 name=tool_name,
                 result=str(e),
-                progress_updates=getattr(progress_callback, 'progress_updates', []),
+                progress_updates=list(progress_updates),
                 duration=duration,
                 status="failure"
             )
@@ -451,22 +561,25 @@ class MCPStreamableHttpClient(_BaseMCPClient):
         Returns:
             The processed output as a dictionary.
         """
-        if isinstance(content, list):
+        if isinstance(content, (list, tuple)):
             # This assumes content is a list of TextContent objects
             texts = [item.text for item in content if hasattr(item, 'text')]
-            processed_content = '\n'.join(texts) if texts else str(content)
+            if not texts:
+                return {"output": str(content)}
+            # A single text part is parsed as-is, without building a joined copy
+            processed_content = texts[0] if len(texts) == 1 else '\n'.join(texts)
         else:
             processed_content = content
 
         if isinstance(processed_content, str):
             try:
                 # Attempt to parse string as JSON
-                parsed_json = json.loads(processed_content)
+                parsed_json = _json_loads(processed_content)
                 if isinstance(parsed_json, dict):
                     return parsed_json
                 # It's valid JSON, but not a dict (e.g., a list, number, or string)
                 return {"output": parsed_json}
-            except json.JSONDecodeError:
+            except ValueError:
                 # It's just a plain string
                 return {"output": processed_content}
 
@@ -481,15 +594,19 @@ class MCPClientManager:
     Manages multiple MCPClient instances and routes tool execution requests
     to the appropriate connected server that provides the desired tool.
     """
+    message_bus = LazyMessageBus()
+    elicitation_bus = LazyMessageBus(single_responder=True)
+    sampling_bus = LazyMessageBus(single_responder=True)
 
     def __init__(self, client_map: Dict[str, MCPClient]):
         self.clients: Dict[str, MCPClient] = client_map
 
         # tool_name → { server_name: str, client: MCPClient }
         self.tool_registry: Dict[str, Dict[str, Any]] = {}
-        self.message_bus = AsyncMessageBus()
-        self.elicitation_bus = AsyncMessageBus()
-        self.sampling_bus = AsyncMessageBus()
+        # Message buses, allocated on first subscription (see LazyMessageBus)
+        self._message_bus: Optional[AsyncMessageBus] = None
+        self._elicitation_bus: Optional[AsyncMessageBus] = None
+        self._sampling_bus: Optional[AsyncMessageBus] = None
 
     def __getitem__(self, tool_name: str) -> Dict[str, Any]:
         entry = self.tool_registry.get(tool_name)
@@ -499,7 +616,7 @@ class MCPClientManager:
 
     @classmethod
     def from_json_config(cls, config_path: Union[str, Path]) -> "MCPClientManager":
-        config = json.loads(Path(config_path).read_text())
+        config = _json_loads(Path(config_path).read_bytes())
         if not isinstance(config, dict):
             raise ValueError("Invalid config: expected a dictionary.")
         return cls.from_dict(config)
@@ -523,23 +640,32 @@ class MCPClientManager:
         async def connect_safe(server_name: str, client: MCPClient):
             try:
                 await client.connect_to_server()
-                # Subscribe the manager's bus to this client's messages
-                client.subscribe(
-                    lambda msg: asyncio.create_task(self.message_bus.broadcast(msg, server_name=server_name))
-                )
-                client.subscribe_elicitation(
-                    lambda context, params: asyncio.create_task(self.elicitation_bus.broadcast(context, params, server_name=server_name))
-                )
-                client.subscribe_sampling(
-                    lambda context, params: asyncio.create_task(self.sampling_bus.broadcast(context, params, server_name=server_name))
-                )
-                logger.info(f"Connected to server '{server_name}'")
+
+                # Forward this client's messages to the manager's buses. The client
+                # bus awaits the forwarders directly, so no task is created per message,
+                # and nothing is broadcast until something subscribes to the manager.
+                async def _forward_msg(msg, _sn=server_name):
+                    if self._message_bus:
+                        return await self._message_bus.broadcast(msg, server_name=_sn)
+
+                async def _forward_elicitation(context, params, _sn=server_name):
+                    if self._elicitation_bus:
+                        return await self._elicitation_bus.broadcast(context, params, server_name=_sn)
+
+                async def _forward_sampling(context, params, _sn=server_name):
+                    if self._sampling_bus:
+                        return await self._sampling_bus.broadcast(context, params, server_name=_sn)
+
+                client.subscribe(_forward_msg)
+                client.subscribe_elicitation(_forward_elicitation)
+                client.subscribe_sampling(_forward_sampling)
+                logger.info("Connected to server '%s'", server_name)
             except Exception as e:
-                logger.error(f"Failed to connect to server '{server_name}': {e}")
+                logger.error("Failed to connect to server '%s': %s", server_name, e)
 
-        await asyncio.gather(*[
-            connect_safe(name, client) for name, client in self.clients.items()
-        ])
+        async with asyncio.TaskGroup() as tg:
+            for name, client in self.clients.items():
+                tg.create_task(connect_safe(name, client))
 
         await self._build_tool_registry()
 
@@ -562,21 +688,25 @@ class MCPClientManager:
         """
         self.tool_registry.clear()
 
-        for server_name, client in self.clients.items():
-            try:
-                tools = await client.get_tools()
-                for tool in tools:
-                    if tool.name not in self.tool_registry:
-                        self.tool_registry[tool.name] = {
-                            "server_name": server_name,
-                            "client": client,
-                            "meta": tool.meta
-                        }
-                        logger.debug(f"Registered tool '{tool.name}' on '{server_name}'")
-            except Exception as e:
-                logger.error(f"Failed to fetch tools from '{server_name}': {e}")
+        # Fetch all tool lists concurrently, then register them in client order
+        results = await asyncio.gather(
+            *[client.get_tools() for client in self.clients.values()],
+            return_exceptions=True
+        )
+        for (server_name, client), tools in zip(self.clients.items(), results):
+            if isinstance(tools, Exception):
+                logger.error("Failed to fetch tools from '%s': %s", server_name, tools)
+                continue
+            for tool in tools:
+                if tool.name not in self.tool_registry:
+                    self.tool_registry[tool.name] = {
+                        "server_name": server_name,
+                        "client": client,
+                        "meta": tool.meta
+                    }
+                    logger.debug("Registered tool '%s' on '%s'", tool.name, server_name)
 
-    async def has_tool(self, tool_name: str) -> bool:
+    def has_tool(self, tool_name: str) -> bool:
         return tool_name in self.tool_registry
 
     async def get_all_available_tools(self) -> Dict[str, List[str]]:
@@ -588,7 +718,7 @@ class MCPClientManager:
             try:
                 listing[server_name] = [tool.name for tool in await client.get_tools()]
             except Exception as e:
-                logger.error(f"Failed to retrieve tools from '{server_name}': {e}")
+                logger.error("Failed to retrieve tools from '%s': %s", server_name, e)
                 listing[server_name] = []
         return listing
 
@@ -598,7 +728,7 @@ class MCPClientManager:
             try:
                 tools.extend(await client.get_tools_for_gemini())
             except Exception as e:
-                logger.error(f"Failed to fetch Gemini tools from '{server_name}': {e}")
+                logger.error("Failed to fetch Gemini tools from '%s': %s", server_name, e)
         return tools
 
     async def execute_tool(self, tool_name: str, tool_args: Dict[str, Any] = None, progress_callback: Optional[Callable] = None) -> ToolResult:
@@ -625,7 +755,7 @@ class MCPClientManager:
                 progress_callback=progress_callback
             )
         except Exception as e:
-            logger.error(f"Failed to execute tool '{tool_name}' on '{server_name}': {e}")
+            logger.error("Failed to execute tool '%s' on '%s': %s", tool_name, server_name, e)
             return ToolResult(
                 name=tool_name,
                 result=str(e),
@@ -634,17 +764,30 @@ class MCPClientManager:
                 status="failure"
             )
 
+    async def execute_tools(self, calls: List[Tuple[str, Dict[str, Any]]], progress_callback: Optional[Callable] = None) -> List[ToolResult]:
+        """
+        Executes several tools concurrently and returns their results in input order.
+
+        MCP sessions accept multiple in-flight requests, so calls to the same
+        server are pipelined rather than awaited one after another. Failures
+        are returned as ToolResult entries with status "failure".
+        """
+        return list(await asyncio.gather(*[
+            self.execute_tool(tool_name, tool_args, progress_callback=progress_callback)
+            for tool_name, tool_args in calls
+        ]))
+
     async def close_all(self):
         async def close_safe(server_name: str, client: MCPClient):
             try:
                 await client.close()
-                logger.info(f"Disconnected from server '{server_name}'")
+                logger.info("Disconnected from server '%s'", server_name)
             except Exception as e:
-                logger.error(f"Failed to close server '{server_name}': {e}")
+                logger.error("Failed to close server '%s': %s", server_name, e)
 
-        await asyncio.gather(*[
-            close_safe(name, client) for name, client in self.clients.items()
-        ])
+        async with asyncio.TaskGroup() as tg:
+            for name, client in self.clients.items():
+                tg.create_task(close_safe(name, client))
 
 
 class ElicitationCallbackHandler:
@@ -658,7 +801,7 @@ class ElicitationCallbackHandler:
                        server_name: str
                        ) -> mcp_types.ElicitResult | mcp_types.ErrorData:
 
-        logger.info(f"Elicitation request from:  '{server_name}': {params}")
+        logger.info("Elicitation request from:  '%s': %s", server_name, params)
         return ElicitResult(
             action="accept",
             content={
@@ -671,13 +814,27 @@ class ElicitationCallbackHandler:
 class StreamingProgressHandler:
     """Handles streaming progress in a visual way."""
 
-    def __init__(self):
+    def __init__(self, max_updates: int = 1024):
+        self.start_time = time.time()
+        # Bounded ring buffer: long-running tools keep only the most recent updates
+        self.progress_updates: collections.deque[ProgressUpdate] = collections.deque(maxlen=max_updates)
+
+    def reset(self) -> None:
+        """Clears recorded updates and restarts the elapsed-time clock."""
         self.start_time = time.time()
+        self.progress_updates.clear()
 
     async def __call__(self, progress: float, total: float, message: str):
         percentage = (progress / total) * 100 if total > 0 else 0
-        elapsed = time.time() - self.start_time
-        logger.info(f"Progress: {percentage:.2f}% - {message} (Elapsed: {elapsed:.2f}s)")
+        self.progress_updates.append(ProgressUpdate.model_construct(
+            progress=progress,
+            total=total,
+            message=message,
+            percentage=percentage,
+        ))
+        if logger.isEnabledFor(logging.INFO):
+            elapsed = time.time() - self.start_time
+            logger.info("Progress: %.2f%% - %s (Elapsed: %.2fs)", percentage, message, elapsed)
 
 
 async def get_mcp_tools(mcp_server_config_path: Union[Path, str]):
@@ -688,13 +845,13 @@ async def get_mcp_tools(mcp_server_config_path: Union[Path, str]):
         mcp_manager = MCPClientManager.from_json_config(mcp_server_config_path)
         await mcp_manager.connect_all()
         tools = await mcp_manager.get_all_available_tools()
-        logger.info(f"Available tools: {tools}")
+        logger.info("Available tools: %s", tools)
         gemini_tools = await mcp_manager.get_all_gemini_tools()
-        logger.info(f"Gemini-compatible tools: {gemini_tools}")
+        logger.info("Gemini-compatible tools: %s", gemini_tools)
 
         function_name = "file_upload_simulation"
         progress_handler = StreamingProgressHandler()
-        if await mcp_manager.has_tool(function_name):
+        if mcp_manager.has_tool(function_name):
             result = await mcp_manager.execute_tool(
                 tool_name=function_name,
                 tool_args={
@@ -702,12 +859,12 @@ async def get_mcp_tools(mcp_server_config_path: Union[Path, str]):
                 },
                 progress_callback=progress_handler
             )
-            logger.info(f"Tool execution result: {result}")
+            logger.info("Tool execution result: %s", result)
         await mcp_manager.close_all()
 
         return tools
     except Exception as e:
-        logger.error(f"Failed to connect to MCP server or retrieve tools: {e}")
+        logger.error("Failed to connect to MCP server or retrieve tools: %s", e)
         raise
 
 
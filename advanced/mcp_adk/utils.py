@@ -1,4 +1,6 @@
 import logging
+import os
+from functools import lru_cache
 from typing import Type, Any
 
 from google.genai import types as genai_types
@@ -8,9 +10,20 @@ from pydantic import ValidationError, BaseModel
 logger = logging.getLogger(__name__)
 
 
-ALLOWED_GEMINI_SCHEMA_KEYS = {"type", "properties", "required"}
+ALLOWED_GEMINI_SCHEMA_KEYS: frozenset[str] = frozenset({"type", "properties", "required"})
 
-def parse_pydantic_model_schema(data: dict, model_cls: Type[BaseModel]) -> BaseModel | None:
+_BEHAVIOR_MEMBERS = genai_types.Behavior.__members__
+_DEFAULT_BEHAVIOR = genai_types.Behavior.BLOCKING
+
+# Set MCP_VALIDATE_SCHEMAS=1 to run full Pydantic validation on tool schemas (debugging)
+VALIDATE_SCHEMAS = os.getenv("MCP_VALIDATE_SCHEMAS", "").lower() in ("1", "true", "yes")
+
+@lru_cache(maxsize=None)
+def _allowed_keys(model_cls: Type[BaseModel]) -> frozenset[str]:
+    """Returns the field names of `model_cls`, computed once per class."""
+    return frozenset(model_cls.model_fields)
+
+def parse_pydantic_model_schema(data: dict, model_cls: Type[BaseModel], validate: bool = False) -> BaseModel | None:
     """
     Attempts to parse a dictionary `data` into a Pydantic model of type `model_cls`.
 
@@ -21,16 +34,21 @@ def parse_pydantic_model_schema(data: dict, model_cls: Type[BaseModel]) -> BaseM
     Args:
         data (dict): Input dictionary to be parsed.
         model_cls (Type[BaseModel]): Target Pydantic model class.
+        validate (bool): Run full Pydantic validation. When False the model is built
+            with `model_construct`, which trusts the input.
 
     Returns:
         BaseModel | None: The instantiated model, or None if validation failed.
     """
-    allowed_keys = model_cls.model_fields.keys()
+    allowed_keys = _allowed_keys(model_cls)
     filtered_properties = {
         k: v for k, v in data.items()
-        if k in allowed_keys and v is not None
+        if v is not None and k in allowed_keys
     }
 
+    if not validate:
+        return model_cls.model_construct(**filtered_properties)
+
     try:
         return model_cls(**filtered_properties)
     except ValidationError as e:
@@ -53,64 +71,110 @@ def _norm_type(tp: Any) -> str | None:
     """
     if tp is None:
         return None
-    if isinstance(tp, str):
-        return tp.lower()
-    if isinstance(tp, list):
+    # Fast path: schema types are almost always lowercase strings already
+    if type(tp) is str:
+        return tp if tp.islower() else tp.lower()
+    if type(tp) is list:
         # Prioritize the first non-null type
         for t in tp:
-            if isinstance(t, str) and t.lower() != "null":
-                return t.lower()
+            if type(t) is str:
+                t = t if t.islower() else t.lower()
+                if t != "null":
+                    return t
     return None
 
 
-def remove_additional_properties(schema: dict | list | Any) -> dict | list | Any:
+def remove_additional_properties(schema: dict | list | Any, _seen: dict[int, Any] | None = None) -> dict | list | Any:
     """
-    Recursively removes 'additional_properties' from OpenAPI/JSON Schema definitions.
+    Removes 'additional_properties' from OpenAPI/JSON Schema definitions, in place.
 
-    Handles nested schemas in:
+    Walks nested schemas with an explicit stack instead of recursion, covering:
       - objects (via 'properties')
       - arrays (via 'items')
       - compositional keywords ('oneOf', 'anyOf', 'allOf')
 
     Args:
         schema (dict | list | Any): A schema or schema component.
+        _seen (dict[int, Any] | None): Memo of already-cleaned nodes keyed by id(). Share one
+            across calls to skip subtrees that several schemas reference. The nodes are kept
+            as values so their ids cannot be reused while the memo is alive.
 
     Returns:
-        dict | list | Any: The cleaned schema with all 'additional_properties' fields removed.
+        dict | list | Any: The same schema with all 'additional_properties' fields removed.
     """
-    # Return primitives as-is
-    if not isinstance(schema, (dict, list)):
-        return schema
+    if _seen is None:
+        _seen = {}
 
-    # If the schema is a list (e.g., oneOf/anyOf/allOf), recurse each item
-    if isinstance(schema, list):
-        return [remove_additional_properties(item) for item in schema]
+    stack = [schema]
+    while stack:
+        node = stack.pop()
 
-    # From this point, we assume schema is a dict
-    schema.pop("additional_properties", None)
+        # Skip subtrees that were already cleaned
+        if id(node) in _seen:
+            continue
 
-    tp = _norm_type(schema.get("type"))
+        # Lists (e.g., oneOf/anyOf/allOf members) are expanded onto the stack
+        if type(node) is list:
+            _seen[id(node)] = node
+            stack.extend(node)
+            continue
+        # Primitives have nothing to clean
+        if type(node) is not dict:
+            continue
+
+        _seen[id(node)] = node
+        node.pop("additional_properties", None)
+
+        tp = _norm_type(node.get("type"))
 
-    # If it's an object, recurse into 'properties'
-    if tp == "object":
-        props = schema.get("properties")
-        if isinstance(props, dict):
-            for key, value in props.items():
-                props[key] = remove_additional_properties(value)
+        # If it's an object, visit its 'properties'
+        if tp == "object":
+            props = node.get("properties")
+            if type(props) is dict:
+                stack.extend(props.values())
 
-    # If it's an array, recurse into 'items'
-    if tp == "array":
-        items = schema.get("items")
-        if items is not None:
-            schema["items"] = remove_additional_properties(items)
+        # If it's an array, visit its 'items'
+        elif tp == "array":
+            items = node.get("items")
+            if items is not None:
+                stack.append(items)
 
-    # Recurse into common composition constructs
-    for kw in ("oneOf", "anyOf", "allOf"):
-        if kw in schema and isinstance(schema[kw], list):
-            schema[kw] = [remove_additional_properties(sub) for sub in schema[kw]]
+        # Visit common composition constructs
+        for kw in ("oneOf", "anyOf", "allOf"):
+            subs = node.get(kw)
+            if type(subs) is list:
+                stack.extend(subs)
 
     return schema
 
+def _parse_properties(tool_name: str, props: dict, validate: bool) -> dict:
+    """
+    Parses each property schema of a tool into a Gemini `Schema` dict, skipping properties
+    that are malformed or, when `validate` is True, fail validation.
+    """
+    parsed_properties = {}
+    for prop_name, prop_schema in props.items():
+        if not isinstance(prop_schema, dict):
+            logger.warning("Tool '%s' property '%s' skipped: invalid format.", tool_name, prop_name)
+            continue
+
+        prop_schema_parsed = parse_pydantic_model_schema(prop_schema, genai_types.Schema, validate=validate)
+        if prop_schema_parsed:
+            parsed_properties[prop_name] = prop_schema_parsed.model_dump(exclude_none=True, warnings=False)
+        else:
+            logger.warning("Tool '%s' property '%s' skipped: schema failed validation.", tool_name, prop_name)
+    return parsed_properties
+
+
+def _function_declaration(tool: mcp_types.Tool, parameters: dict, behavior: genai_types.Behavior) -> genai_types.FunctionDeclaration:
+    return genai_types.FunctionDeclaration(
+        name=tool.name,
+        description=tool.description or "No description provided.",
+        parameters=parameters,
+        behavior=behavior
+    )
+
+
 def mcp_tools_to_gemini(mcp_tools: list[mcp_types.Tool]) -> list:
     """
     Converts a list of tool definitions to a format compatible with Gemini function calling.
@@ -119,61 +183,52 @@ def mcp_tools_to_gemini(mcp_tools: list[mcp_types.Tool]) -> list:
         mcp_tools (mcp_types.ListToolsResult): The MCP tools to convert.
 
     Returns:
-        list[dict]: List of tools formatted for Gemini.
+        list[genai_types.Tool]: A single Tool grouping every function declaration, or an empty list.
     """
-    gemini_tools =  []
+    function_declarations: list[genai_types.FunctionDeclaration] = []
+    # Shared across tools so common sub-schemas are only cleaned once
+    cleaned_schemas = {}
     for tool in mcp_tools:
         raw_schema = tool.inputSchema or {}
         # Extract only allowed schema keys
-        valid_schema_properties = {k: v for k, v in raw_schema.items() if k in ALLOWED_GEMINI_SCHEMA_KEYS}
+        valid_schema_properties = {k: raw_schema[k] for k in raw_schema.keys() & ALLOWED_GEMINI_SCHEMA_KEYS}
 
         # Skip tools without a valid object-type schema
         if _norm_type(valid_schema_properties.get("type")) != "object":
-            logger.warning(f"Tool '{tool.name}' skipped: schema type is not 'object'.")
+            logger.warning("Tool '%s' skipped: schema type is not 'object'.", tool.name)
             continue
 
         props = valid_schema_properties.get("properties")
         if not isinstance(props, dict):
-            logger.warning(f"Tool '{tool.name}' skipped: 'properties' is not a valid dict.")
+            logger.warning("Tool '%s' skipped: 'properties' is not a valid dict.", tool.name)
             continue
 
-        # Parse and filter properties using Pydantic model validation
-        parsed_properties = {}
-        for prop_name, prop_schema in props.items():
-            if not isinstance(prop_schema, dict):
-                logger.warning(f"Tool '{tool.name}' property '{prop_name}' skipped: invalid format.")
-                continue
-
-            prop_schema_parsed = parse_pydantic_model_schema(prop_schema, genai_types.Schema)
-            if prop_schema_parsed:
-                parsed_properties[prop_name] = prop_schema_parsed.model_dump()
-            else:
-                logger.warning(f"Tool '{tool.name}' property '{prop_name}' skipped: schema failed validation.")
-
-        # Replace properties with validated and cleaned ones
-        valid_schema_properties["properties"] = parsed_properties
+        # Build the properties without validation; validate only if the declaration is rejected
+        valid_schema_properties["properties"] = _parse_properties(tool.name, props, validate=VALIDATE_SCHEMAS)
 
-        # Remove invalid properties across the schema
-        valid_schema_properties = remove_additional_properties(valid_schema_properties)
-        tool_behavior = genai_types.Behavior.BLOCKING  # Default behavior
+        # Remove invalid properties across the schema (mutates it in place)
+        remove_additional_properties(valid_schema_properties, cleaned_schemas)
+        tool_behavior = _DEFAULT_BEHAVIOR
         if tool.meta:
-            tool_behavior = tool.meta.get("behavior", "BLOCKING").upper()
-            tool_behavior = genai_types.Behavior.__members__.get(tool_behavior, "BLOCKING")
+            tool_behavior = _BEHAVIOR_MEMBERS.get(tool.meta.get("behavior", "BLOCKING").upper(), _DEFAULT_BEHAVIOR)
             #logger.info(f"Tool '{tool.name}' behavior: {tool_behavior}")
 
         try:
-            gemini_tools.append(
-                genai_types.Tool(function_declarations=[
-                    genai_types.FunctionDeclaration(
-                        name=tool.name,
-                        description=tool.description or "No description provided.",
-                        parameters=valid_schema_properties,
-                        behavior=tool_behavior
-                    )
-                ])
-            )
+            declaration = _function_declaration(tool, valid_schema_properties, tool_behavior)
         except Exception as e:
-            logger.error(f"Tool '{tool.name}' skipped due to schema error: {e}")
-            raise
+            if VALIDATE_SCHEMAS:
+                logger.error("Tool '%s' skipped due to schema error: %s", tool.name, e)
+                continue
+            # Fall back to validated construction, dropping the properties that fail validation
+            logger.warning("Tool '%s' schema rejected (%s); retrying with validated properties.", tool.name, e)
+            valid_schema_properties["properties"] = _parse_properties(tool.name, props, validate=True)
+            remove_additional_properties(valid_schema_properties)
+            try:
+                declaration = _function_declaration(tool, valid_schema_properties, tool_behavior)
+            except Exception as e:
+                logger.error("Tool '%s' skipped due to schema error: %s", tool.name, e)
+                continue
+        function_declarations.append(declaration)
 
-    return gemini_tools
+    # Group all declarations into one Tool so the request carries a single wrapper
+    return [genai_types.Tool(function_declarations=function_declarations)] if function_declarations else []
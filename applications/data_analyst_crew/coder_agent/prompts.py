@@ -1,13 +1,6 @@
 import typing
 
-def get_agents_prompts() -> typing.Tuple[str, str]:
-    """
-    Returns prompts for two agents:
-    - A code generation agent responsible for writing or updating Python code
-    - A code reviewer agent responsible for validating the code against given requirements
-    """
-
-    code_generation_prompt = """
+_CODE_GEN_PROMPT = """
     You are a software engineer tasked with generating or refining Python code.
 
     Instructions:
@@ -22,8 +15,18 @@ def get_agents_prompts() -> typing.Tuple[str, str]:
     - If any required library is missing, recommend how to install it (e.g., pip install <library>).
     """
 
-    code_reviewer_prompt = """
+_CODE_EXECUTION_PROMPT = """
+    - Retrieve the code from "current_code" in the state.
+    - Execute it and report its output, including any errors or tracebacks.
+    - Do not modify the code.
+
+    Additional Notes:
+    - Relevant data is available in "sql_results.csv".
+    """
+
+_CODE_REVIEW_PROMPT = """
     - Retrieve the code from "current_code" in the state.
+    - Take its execution output from "execution_result" into account; code that fails to run does not pass.
     - Evaluate it against the criteria in "requirements", if available.
     - If no requirements are present, assess the code for correctness, clarity, and maintainability. 
     Additionally propose improvements.
@@ -46,4 +49,12 @@ def get_agents_prompts() -> typing.Tuple[str, str]:
     
     """
 
-    return code_generation_prompt, code_reviewer_prompt
+
+def get_agents_prompts() -> typing.Tuple[str, str, str]:
+    """
+    Returns prompts for three agents:
+    - A code generation agent responsible for writing or updating Python code
+    - A code execution agent responsible for running the code and reporting its output
+    - A code reviewer agent responsible for validating the code against given requirements
+    """
+    return _CODE_GEN_PROMPT, _CODE_EXECUTION_PROMPT, _CODE_REVIEW_PROMPT
@@ -1,14 +1,7 @@
 import typing
 
 
-def get_agents_prompts() -> typing.Tuple[str, str]:
-    """
-    Returns instruction strings for:
-    - SQL junior agent (query generation)
-    - SQL senior agent (query validation and execution)
-    """
-    junior_instruction = (
-        """
+_JUNIOR_INSTRUCTION = """
         **Task:**
         Construct a valid SQL query using the database schema provided in the current session context.
         
@@ -39,10 +32,8 @@ def get_agents_prompts() -> typing.Tuple[str, str]:
         **Goal:**
         Produce a clean, executable SQL statement that reflects the intended logic of the task while fully adhering to the structure defined in the available schema.
         """
-    )
 
-    senior_instruction = (
-        """
+_SENIOR_INSTRUCTION = """
         **Task:**
         Review and validate the SQL query stored in session state, and execute it if it passes validation.
         
@@ -81,6 +72,12 @@ def get_agents_prompts() -> typing.Tuple[str, str]:
         **Goal:**
         Ensure the SQL query is both valid and optimal before execution. Provide reliable and structured results to be consumed by subsequent agents or tools.
         """
-    )
 
-    return junior_instruction, senior_instruction
\ No newline at end of file
+
+def get_agents_prompts() -> typing.Tuple[str, str]:
+    """
+    Returns instruction strings for:
+    - SQL junior agent (query generation)
+    - SQL senior agent (query validation and execution)
+    """
+    return _JUNIOR_INSTRUCTION, _SENIOR_INSTRUCTION
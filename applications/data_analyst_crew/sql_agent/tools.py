@@ -1,65 +1,125 @@
+import asyncio
+import csv
+import hashlib
+import io
 import os
 import sqlite3
 import logging
-from typing import Any, Dict
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 
 from google.adk.tools import ToolContext
 import google.genai.types as types
-from tabulate import tabulate
-import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# One long-lived connection per database file, shared by the worker threads
+# that run queries. SQLite connections are not safe for concurrent use, so
+# every access goes through _CONN_LOCK.
+_CONNECTIONS: Dict[str, sqlite3.Connection] = {}
+_CONN_LOCK = threading.RLock()
+
+# Session state key holding the digest of the last saved sql_results.csv
+SQL_RESULTS_HASH_KEY = "_last_sql_hash"
+
+
+def _get_conn(db_path: str) -> sqlite3.Connection:
+    """Return the shared connection for `db_path`, opening it in WAL mode on first use."""
+    with _CONN_LOCK:
+        conn = _CONNECTIONS.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+            _CONNECTIONS[db_path] = conn
+        return conn
+
+
+def _db_mtime(db_path: str) -> float:
+    """Last modification time of the database, including writes still sitting in the WAL file."""
+    mtime = os.path.getmtime(db_path)
+    wal_path = f"{db_path}-wal"
+    if os.path.exists(wal_path):
+        mtime = max(mtime, os.path.getmtime(wal_path))
+    return mtime
+
+
+@lru_cache(maxsize=4)
+def _build_schema_md(db_path: str, mtime: float) -> str:
+    """Build the Markdown schema for `db_path`; `mtime` keys the cache so edits invalidate it."""
+    with _CONN_LOCK:
+        cursor = _get_conn(db_path).cursor()
+        cursor.execute("""
+            SELECT name, sql FROM sqlite_master 
+            WHERE type='table' AND name NOT LIKE 'sqlite_%'
+            ORDER BY name;
+        """)
+        schema_entries = cursor.fetchall()
+
+    parts = ["** SQLite Schema\n"]
+    for table_name, create_sql in schema_entries:
+        parts.append(f"\n** Table: {table_name}\n{create_sql};\n")
+    return "".join(parts)
 
 
 def get_db_schema() -> Dict[str, Any]:
     """Fetch the SQL schema of the database as Markdown text."""
     try:
         db_path = os.getenv("DB_PATH")
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT name, sql FROM sqlite_master 
-                WHERE type='table' AND name NOT LIKE 'sqlite_%'
-                ORDER BY name;
-            """)
-            schema_entries = cursor.fetchall()
-
-        schema_md = "** SQLite Schema\n"
-        for table_name, create_sql in schema_entries:
-            schema_md += f"\n** Table: {table_name}\n{create_sql};\n"
-
+        schema_md = _build_schema_md(db_path, _db_mtime(db_path))
         return {"status": "success", "schema": schema_md}
-    except sqlite3.Error as e:
+    except (sqlite3.Error, OSError) as e:
         logger.exception("Failed to fetch DB schema.")
         return {"status": "error", "error_message": str(e)}
 
 
+def _run_query(query: str, db_path: str) -> Tuple[List[tuple], List[str]]:
+    """Run `query` against `db_path` and return its rows and column names (blocking)."""
+    with _CONN_LOCK:
+        conn = _get_conn(db_path)
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            rows = cursor.fetchall()
+            headers = [desc[0] for desc in cursor.description]
+    return rows, headers
+
+
 async def execute_sql_query(query: str, tool_context: ToolContext) -> Dict[str, Any]:
     """Execute a SQL query and return results as a Markdown table."""
     logger.info("Executing SQL query:\n%s", query)
     try:
         db_path = os.getenv("DB_PATH")
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            headers = [desc[0] for desc in cursor.description]
+        # Run the blocking SQLite work off the event loop
+        rows, headers = await asyncio.to_thread(_run_query, query, db_path)
 
         if not rows:
             return {"status": "success", "results": "No results returned."}
 
+        # Imported lazily so loading the tools (e.g. for get_db_schema) stays cheap
+        from tabulate import tabulate
+
         markdown_table = tabulate(rows, headers=headers, tablefmt="github")
         logger.info("Query executed successfully. Results:\n%s", markdown_table)
-        # Convert to DataFrame for better formatting
-        df = pd.DataFrame(rows, columns=headers)
-        artifact_part = types.Part(
-            inline_data=types.Blob(
-                mime_type="text/csv",
-                data=df.to_csv(index=False).encode("utf-8")
+        # Write the CSV directly with the stdlib writer
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerow(headers)
+        writer.writerows(rows)
+        csv_bytes = buf.getvalue().encode("utf-8")
+
+        # The SQL loop often re-runs the same query; only save a new artifact version when the results change
+        csv_digest = hashlib.sha1(csv_bytes).hexdigest()
+        if tool_context.state.get(SQL_RESULTS_HASH_KEY) != csv_digest:
+            artifact_part = types.Part(
+                inline_data=types.Blob(
+                    mime_type="text/csv",
+                    data=csv_bytes
+                )
             )
-        )
-        await tool_context.save_artifact("sql_results.csv", artifact_part)
+            await tool_context.save_artifact("sql_results.csv", artifact_part)
+            tool_context.state[SQL_RESULTS_HASH_KEY] = csv_digest
         return {"status": "success", "results": markdown_table}
     except sqlite3.Error as e:
         logger.exception("Query execution failed.")
@@ -3,7 +3,9 @@ import logging
 logger = logging.getLogger(__name__)
 
 import os
+import re
 import uuid
+from functools import lru_cache
 
 from google.adk import Runner
 from google.adk.agents import BaseAgent
@@ -17,11 +19,27 @@ from rich.syntax import Syntax
 
 console = Console()
 
+_SQL_RE = re.compile(r"^\s*select\b|\bfrom\b", re.IGNORECASE)
+
+# Process-wide identifiers and services, shared by every call_agent invocation
+APP_NAME = os.getenv("APP_NAME", str(uuid.uuid4()))
+USER_ID = os.getenv("USER_ID", str(uuid.uuid4()))
+_session_service: InMemorySessionService | None = None
+_artifact_service: InMemoryArtifactService | None = None
+_runners: dict[str, Runner] = {}
+
+@lru_cache(maxsize=128)
+def _build_syntax(content: str, language: str) -> Syntax:
+    """
+    Build (and cache) the highlighted Syntax for `content`, so repeated content is not re-lexed.
+    """
+    return Syntax(content, language, line_numbers=False, theme="monokai")
+
 def render_rich_panel(author: str, content: str, language: str = "markdown") -> None:
     """
     Render content inside a stylized Rich panel with optional syntax highlighting.
     """
-    syntax = Syntax(content, language, line_numbers=False, theme="monokai")
+    syntax = _build_syntax(content, language)
     panel = Panel(syntax, title=f"[bold cyan]{author}", border_style="green", padding=(1, 2))
     console.print(panel)
 
@@ -32,41 +50,57 @@ def detect_language(content: str) -> str:
     if not content:
         return "markdown"
     content = content.strip()
-    if content.startswith("{") and content.endswith("}"):
+    if not content:
+        return "markdown"
+    if content[0] == "{" and content[-1] == "}":
         return "json"
-    elif content.lower().startswith("select") or " from " in content.lower():
-        return "sql"
-    return "markdown"
+    # Single case-insensitive pass instead of lowercasing copies of the content
+    return "sql" if _SQL_RE.search(content) else "markdown"
+
+def _get_runner(agent: BaseAgent) -> Runner:
+    """
+    Return the runner for `agent`, creating it (and the shared services) on first use.
+    """
+    global _session_service, _artifact_service
+    if _session_service is None:
+        _session_service = InMemorySessionService()
+        _artifact_service = InMemoryArtifactService()
+    runner = _runners.get(agent.name)
+    if runner is None:
+        runner = Runner(
+            agent=agent,
+            app_name=APP_NAME,
+            session_service=_session_service,
+            artifact_service=_artifact_service,
+        )
+        _runners[agent.name] = runner
+    return runner
 
 async def call_agent(agent: BaseAgent, prompt: str) -> None:
     """
     Call the root agent with a prompt and print the final output using Rich panels.
 
+    Answers are not cached: the agents write artifacts (sql_results.csv) and session state
+    that later agents read, so every call runs the agent.
+
     Args:
         agent:  The agent to be called.
         prompt (str): Natural language query for database.
     """
-    APP_NAME = os.getenv("APP_NAME", str(uuid.uuid4()))
-    USER_ID = os.getenv("USER_ID", str(uuid.uuid4()))
     SESSION_ID = os.getenv("SESSION_ID", str(uuid.uuid4()))
 
-    session_service = InMemorySessionService()
-    artifact_service = InMemoryArtifactService()
-
-    runner = Runner(
-        agent=agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-        artifact_service=artifact_service,
-    )
-    session = await session_service.create_session(
+    runner = _get_runner(agent)
+    session = await _session_service.get_session(
         app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
     )
+    if session is None:
+        session = await _session_service.create_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
+        )
 
     content = types.Content(role="user", parts=[types.Part(text=prompt)])
-    events = runner.run(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
 
-    for event in events:
+    async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content):
         if event.is_final_response() and event.content:
             response_text = event.content.parts[0].text
             logger.info(f"Final response from {event.author}")
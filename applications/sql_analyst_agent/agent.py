@@ -1,8 +1,20 @@
+import asyncio
+import hashlib
+import io
+import json
 import logging
 import os
+import queue
+import re
 import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List
 
 from dotenv import load_dotenv
 from google.adk import Runner, Agent
@@ -10,9 +22,9 @@ from google.adk.agents import LlmAgent, LoopAgent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.artifacts import InMemoryArtifactService
 from google.adk.sessions import InMemorySessionService
+from google import genai
 from google.genai import types
 from rich.logging import RichHandler
-from tabulate import tabulate
 
 # Load environment variables from .env
 load_dotenv()
@@ -32,38 +44,338 @@ DB_PATH = os.getenv("DB_PATH")
 APP_NAME = "db_agent_app"
 USER_ID = "dev_user_01"
 SESSION_ID = "dev_user_session_01"
+# Upper bound on rows returned to the model; rows are fetched in batches of FETCH_BATCH_SIZE
+MAX_ROWS = int(os.getenv("MAX_ROWS", 10_000))
+FETCH_BATCH_SIZE = 1024
+# With DECOMPOSE_QUERIES=1, compound questions are split into at most MAX_SUBQUERIES independent
+# questions run in parallel; off by default since the split costs an extra LLM round-trip per prompt
+DECOMPOSE_QUERIES = os.getenv("DECOMPOSE_QUERIES", "0").lower() in ("1", "true", "yes")
+MAX_SUBQUERIES = 4
+# Pre-flight SELECT/WITH queries with EXPLAIN QUERY PLAN to warn the model about full table scans
+CHECK_QUERY_PLAN = os.getenv("CHECK_QUERY_PLAN", "0").lower() in ("1", "true", "yes")
+# Set QUERY_CACHE_TTL to replay answers to repeated prompts for that many seconds (off by default)
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 0))
+QUERY_CACHE_SIZE = 256
+# Sidecar file caching the rendered schema across runs, keyed by DB path, mtime and format version
+SCHEMA_CACHE_VERSION = 3
+# Column null/distinct counts are computed over the first SCHEMA_STATS_ROWS rows of each table
+SCHEMA_STATS_ROWS = int(os.getenv("SCHEMA_STATS_ROWS", 10_000))
+# SCHEMA_SAMPLE_VALUES=1 adds a few sample values per column, i.e. raw row data, to the schema
+SCHEMA_SAMPLE_VALUES = os.getenv("SCHEMA_SAMPLE_VALUES", "0").lower() in ("1", "true", "yes")
+SCHEMA_CACHE_PATH = Path(os.getenv("SCHEMA_CACHE_PATH", Path.home() / ".cache" / "db-agent" / "schema.json"))
 
-# --- Agent Tools ---
-def get_db_schema() -> Dict[str, Any]:
+
+# --- Database Connection ---
+# One writer connection for the lifetime of the process, plus a pool of read-only
+# connections so concurrent sessions can read in parallel. All of them are opened on first use.
+# sqlite3 keeps prepared statements in a per-connection LRU; make it large enough for the
+# repeated introspection and EXPLAIN QUERY PLAN statements
+READ_POOL_SIZE = int(os.getenv("READ_POOL_SIZE", min(8, os.cpu_count() or 1)))
+# SQLITE_WAL=1 switches the database to WAL so readers never wait for a writer. This rewrites
+# the database file's journal mode permanently, so it is left alone unless asked for
+SQLITE_WAL = os.getenv("SQLITE_WAL", "0").lower() in ("1", "true", "yes")
+_READ_ONLY_RE = re.compile(r"^\s*(select|with|explain)\b", re.IGNORECASE)
+_PLANNABLE_RE = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+# Statements that write, change the schema or touch other databases are refused outright.
+# REPLACE is only matched as a statement keyword, not the replace() string function
+_UNSAFE_RE = re.compile(
+    r"\b(drop|delete|update|insert|alter|create|reindex|analyze|attach|detach|pragma|vacuum|replace(?!\s*\())\b",
+    re.IGNORECASE,
+)
+# String literals and quoted identifiers are removed before matching, so `action = 'delete'` is allowed
+_QUOTED_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+
+@lru_cache(maxsize=128)
+def _compile_pattern(pattern: str) -> "re.Pattern[str]":
+    return re.compile(pattern)
+
+
+def _regexp(pattern: str | None, value: Any) -> bool:
+    # Backs `value REGEXP pattern`, which SQLite rewrites to regexp(pattern, value)
+    if pattern is None or value is None:
+        return False
+    return _compile_pattern(pattern).search(str(value)) is not None
+
+
+def _levenshtein(a: str | None, b: str | None) -> int | None:
+    """Edit distance between two strings."""
+    if a is None or b is None:
+        return None
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _register_functions(conn: sqlite3.Connection) -> None:
+    # Deterministic functions can be factored out of loops and used in indexes by SQLite
+    conn.create_function("REGEXP", 2, _regexp, deterministic=True)
+    conn.create_function("LEVENSHTEIN", 2, _levenshtein, deterministic=True)
+
+
+_CONN: sqlite3.Connection | None = None
+_CONN_LOCK = threading.Lock()
+
+
+def _open_writer() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, cached_statements=256)
+    if SQLITE_WAL:
+        conn.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;")
+    conn.executescript("PRAGMA busy_timeout=5000; PRAGMA cache_size=-65536;")
+    _register_functions(conn)
+    return conn
+
+
+def _open_reader() -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        f"{Path(DB_PATH).resolve().as_uri()}?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        isolation_level=None,
+        cached_statements=256,
+    )
+    conn.executescript("PRAGMA busy_timeout=5000; PRAGMA cache_size=-65536;")
+    _register_functions(conn)
+    return conn
+
+
+_READ_POOL: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+_READ_POOL_LOCK = threading.Lock()
+_readers_opened = 0
+
+
+def _borrow_reader() -> sqlite3.Connection:
+    """
+    Take an idle reader from the pool, opening a new one while fewer than READ_POOL_SIZE
+    exist, or wait for one to be returned.
     """
-    Fetch the SQL schema of the database as Markdown text.
+    global _readers_opened
+    try:
+        return _READ_POOL.get_nowait()
+    except queue.Empty:
+        pass
+    with _READ_POOL_LOCK:
+        can_open = _readers_opened < READ_POOL_SIZE
+        if can_open:
+            _readers_opened += 1
+    if can_open:
+        try:
+            return _open_reader()
+        except sqlite3.Error:
+            with _READ_POOL_LOCK:
+                _readers_opened -= 1
+            raise
+    return _READ_POOL.get()
 
-    Returns:
-        dict: Dictionary containing status and schema or error message.
+
+@contextmanager
+def _connection(read_only: bool) -> Iterator[sqlite3.Connection]:
     """
+    Borrow a pooled read-only connection, or the writer connection for statements that
+    may modify the database.
+    """
+    global _CONN
+    if read_only:
+        conn = _borrow_reader()
+        try:
+            yield conn
+        finally:
+            _READ_POOL.put(conn)
+    else:
+        with _CONN_LOCK:
+            if _CONN is None:
+                _CONN = _open_writer()
+            yield _CONN
+
+
+def _db_mtime(db_path: str) -> float:
+    # In WAL mode recent writes land in the -wal file until the next checkpoint
+    mtime = os.path.getmtime(db_path)
+    wal_path = f"{db_path}-wal"
+    if os.path.exists(wal_path):
+        mtime = max(mtime, os.path.getmtime(wal_path))
+    return mtime
+
+
+# --- Schema Cache ---
+def _read_schema_cache() -> Dict[str, str]:
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
+        return json.loads(SCHEMA_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_schema_cache(cache: Dict[str, str]) -> None:
+    # Write to a temporary file and rename it so readers never see a partial file
+    try:
+        SCHEMA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=SCHEMA_CACHE_PATH.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, SCHEMA_CACHE_PATH)
+    except OSError:
+        logger.warning("Could not write schema cache to %s", SCHEMA_CACHE_PATH, exc_info=True)
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _md_cell(value: Any) -> str:
+    # Pipes and line breaks would split a Markdown table cell
+    return str(value).replace("|", "\\|").replace("\r", " ").replace("\n", " ")
+
+
+def _describe_table(cursor: sqlite3.Cursor, table_name: str) -> str:
+    """
+    Render one table as Markdown: its columns with type, key and null/distinct counts over
+    the first SCHEMA_STATS_ROWS rows (plus a few sample values with SCHEMA_SAMPLE_VALUES),
+    followed by its foreign keys.
+    """
+    table = _quote_ident(table_name)
+    columns = cursor.execute(f"PRAGMA table_info({table})").fetchall()
+    foreign_keys = cursor.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+    # Bound every scan below to a prefix of the table
+    sample = f"(SELECT * FROM {table} LIMIT {SCHEMA_STATS_ROWS})"
+
+    # Gather the sampled row count and per-column null/distinct counts in a single scan
+    aggregates = ["COUNT(*)"]
+    for _, col_name, *_ in columns:
+        col = _quote_ident(col_name)
+        aggregates.append(f"SUM({col} IS NULL)")
+        aggregates.append(f"COUNT(DISTINCT {col})")
+    stats = cursor.execute(f"SELECT {', '.join(aggregates)} FROM {sample}").fetchone()
+    row_count = stats[0]
+    rows_text = f"{row_count} rows" if row_count < SCHEMA_STATS_ROWS else f"stats over the first {row_count} rows"
+
+    header = "| column | type | key | nulls | distinct |"
+    rule = "|--------|------|-----|-------|----------|"
+    if SCHEMA_SAMPLE_VALUES:
+        header += " sample values |"
+        rule += "---------------|"
+    lines = [f"\n** Table: {_md_cell(table_name)} ({rows_text})", header, rule]
+    for i, (_, col_name, col_type, not_null, _, pk) in enumerate(columns):
+        key = "PK" if pk else ("NOT NULL" if not_null else "")
+        nulls = stats[1 + 2 * i] or 0
+        distinct = stats[2 + 2 * i]
+        line = f"| {_md_cell(col_name)} | {_md_cell(col_type or 'ANY')} | {key} | {nulls} | {distinct} |"
+        if SCHEMA_SAMPLE_VALUES:
+            col = _quote_ident(col_name)
+            samples = cursor.execute(
+                f"SELECT DISTINCT {col} FROM {sample} WHERE {col} IS NOT NULL LIMIT 3"
+            ).fetchall()
+            line += " " + _md_cell(", ".join(repr(v)[:40] for (v,) in samples)) + " |"
+        lines.append(line)
+
+    for fk in foreign_keys:
+        _, _, ref_table, from_col, to_col = fk[:5]
+        lines.append(f"- FK: {table_name}.{from_col} -> {ref_table}.{to_col}")
+    return "\n".join(lines) + "\n"
+
+
+def _query_schema() -> str:
+    with _connection(read_only=True) as conn:
+        cursor = conn.cursor()
+        try:
             cursor.execute("""
-                SELECT name, sql FROM sqlite_master 
+                SELECT name FROM sqlite_master 
                 WHERE type='table' AND name NOT LIKE 'sqlite_%'
                 ORDER BY name;
             """)
-            schema_entries = cursor.fetchall()
+            table_names = [name for (name,) in cursor.fetchall()]
+
+            schema_md = "** SQLite Schema\n"
+            for table_name in table_names:
+                schema_md += _describe_table(cursor, table_name)
+        finally:
+            cursor.close()
+    return schema_md
+
+
+def load_schema() -> str:
+    """
+    Return the schema Markdown for the database at DB_PATH, reading it from the on-disk
+    cache when the database has not changed since it was cached.
+
+    Returns:
+        str: The schema rendered as Markdown.
+    """
+    key = f"{DB_PATH}:{_db_mtime(DB_PATH)}:v{SCHEMA_CACHE_VERSION}:{SCHEMA_STATS_ROWS}:{int(SCHEMA_SAMPLE_VALUES)}"
+    cache = _read_schema_cache()
+    schema_md = cache.get(key)
+    if schema_md is None:
+        schema_md = _query_schema()
+        # Drop entries for older versions of the same database
+        cache = {k: v for k, v in cache.items() if not k.startswith(f"{DB_PATH}:")}
+        cache[key] = schema_md
+        _write_schema_cache(cache)
+    return schema_md
 
-        schema_md = "** SQLite Schema\n"
-        for table_name, create_sql in schema_entries:
-            schema_md += f"\n** Table: {table_name}\n{create_sql};\n"
 
+# --- Agent Tools ---
+def get_db_schema() -> Dict[str, Any]:
+    """
+    Fetch the SQL schema of the database as Markdown text, including column types, keys,
+    null/distinct counts and foreign keys.
+
+    Returns:
+        dict: Dictionary containing status and schema or error message.
+    """
+    try:
+        schema_md = load_schema()
         return {"status": "success", "schema": schema_md}
-    except sqlite3.Error as e:
+    except (sqlite3.Error, OSError) as e:
         logger.exception("Failed to fetch DB schema.")
         return {"status": "error", "error_message": str(e)}
 
 
-def execute_sql_query(query: str) -> Dict[str, Any]:
+def format_github(rows: List[tuple], headers: List[str]) -> str:
     """
-    Execute a SQL query and return results as a Markdown table.
+    Render rows as a GitHub-flavoured Markdown table.
+
+    Args:
+        rows (list[tuple]): Result rows.
+        headers (list[str]): Column names.
+
+    Returns:
+        str: The Markdown table.
+    """
+    cells = [["" if v is None else str(v) for v in row] for row in rows]
+    widths = [len(h) for h in headers]
+    for row in cells:
+        for i, v in enumerate(row):
+            if len(v) > widths[i]:
+                widths[i] = len(v)
+
+    buf = io.StringIO()
+    buf.write("| " + " | ".join(h.ljust(w) for h, w in zip(headers, widths)) + " |\n")
+    buf.write("|" + "|".join("-" * (w + 2) for w in widths) + "|")
+    for row in cells:
+        buf.write("\n| " + " | ".join(v.ljust(w) for v, w in zip(row, widths)) + " |")
+    return buf.getvalue()
+
+
+def _full_scans(cursor: sqlite3.Cursor, query: str) -> List[str]:
+    """
+    Run EXPLAIN QUERY PLAN for `query` and return the plan steps that scan a whole table
+    without an index.
+    """
+    plan = cursor.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+    return [
+        detail for *_, detail in plan
+        if detail.startswith("SCAN ") and " USING " not in detail and "CONSTANT ROW" not in detail
+    ]
+
+
+async def execute_sql_query(query: str) -> Dict[str, Any]:
+    """
+    Execute a SQL query and return results as a Markdown table. Statements that modify
+    the database or its schema are refused.
 
     Args:
         query (str): The SQL statement to run.
@@ -71,21 +383,55 @@ def execute_sql_query(query: str) -> Dict[str, Any]:
     Returns:
         dict: Dictionary containing execution status and results or error message.
     """
+    # Run the blocking query in a worker thread so concurrent sessions can use the reader pool
+    return await asyncio.to_thread(_execute_sql_query, query)
+
+
+def _execute_sql_query(query: str) -> Dict[str, Any]:
+    """Blocking implementation of execute_sql_query."""
     logger.info("Executing SQL query:\n%s", query)
+    if _UNSAFE_RE.search(_QUOTED_RE.sub("''", query)):
+        logger.warning("Refused SQL query with a write/DDL keyword.")
+        return {"status": "error", "error_message": "Refused: only read-only queries are allowed (write/DDL keyword found)."}
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with _connection(read_only=bool(_READ_ONLY_RE.match(query))) as conn:
             cursor = conn.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            headers = [desc[0] for desc in cursor.description]
+            try:
+                # Pre-flight the plan so the model learns about unindexed full-table scans
+                full_scans = _full_scans(cursor, query) if CHECK_QUERY_PLAN and _PLANNABLE_RE.match(query) else []
+                if full_scans:
+                    logger.info("Query plan performs full table scans: %s", full_scans)
+
+                cursor.execute(query)
+                headers = [desc[0] for desc in cursor.description or ()]
+                # Stream rows in batches and stop once the cap is exceeded
+                rows = []
+                while chunk := cursor.fetchmany(FETCH_BATCH_SIZE):
+                    rows.extend(chunk)
+                    if len(rows) > MAX_ROWS:
+                        break
+            finally:
+                cursor.close()
+
+        result: Dict[str, Any] = {"status": "success"}
+        if full_scans:
+            result["query_plan_warning"] = "Full table scan without an index: " + "; ".join(full_scans)
 
         if not rows:
             logger.info("Query executed successfully. No rows returned.")
-            return {"status": "success", "results": "No results returned."}
+            result["results"] = "No results returned."
+            return result
+
+        truncated = len(rows) > MAX_ROWS
+        if truncated:
+            del rows[MAX_ROWS:]
 
-        markdown_table = tabulate(rows, headers=headers, tablefmt="github")
+        markdown_table = format_github(rows, headers)
+        if truncated:
+            markdown_table += f"\n\n_Results truncated to the first {MAX_ROWS} rows._"
         logger.info("Query executed successfully.")
-        return {"status": "success", "results": markdown_table}
+        result["results"] = markdown_table
+        return result
     except sqlite3.Error as e:
         logger.exception("Query execution failed.")
         return {"status": "error", "error_message": str(e)}
@@ -102,23 +448,67 @@ def on_before_agent_call(callback_context: CallbackContext) -> None:
 
 
 # --- Initialize Schema ---
-schema_result = get_db_schema()
-if schema_result["status"] != "success":
-    raise RuntimeError("Failed to retrieve database schema.")
+# Only the table names are inlined into the instructions; the DDL of the tables most
+# relevant to each prompt is added per call, and the full schema is fetched on demand
+RELEVANT_TABLES_K = int(os.getenv("RELEVANT_TABLES_K", 5))
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> set[str]:
+    """Lowercased word tokens of `text`, split on underscores, with a trailing plural 's' dropped."""
+    return {t[:-1] if len(t) > 3 and t.endswith("s") else t for t in _TOKEN_RE.findall(text.lower())}
+
+
+def _index_tables() -> tuple[Dict[str, str], Dict[str, set[str]]]:
+    with _connection(read_only=True) as conn:
+        rows = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name;"
+        ).fetchall()
+        table_index = {name: sql for name, sql in rows}
+        table_tokens = {}
+        for name in table_index:
+            columns = conn.execute(f"PRAGMA table_info({_quote_ident(name)})").fetchall()
+            table_tokens[name] = _tokens(" ".join([name, *(col[1] for col in columns)]))
+    return table_index, table_tokens
+
+
+_TABLE_INDEX, _TABLE_TOKENS = _index_tables()
+table_list = ", ".join(_TABLE_INDEX)
+
+
+def relevant_schema(prompt: str, k: int = RELEVANT_TABLES_K) -> str:
+    """
+    Return the CREATE statements of the `k` tables whose table and column names share the
+    most words with `prompt`, or an empty string if none match.
+
+    Args:
+        prompt (str): Natural language query for database.
+        k (int): Maximum number of tables to include.
+
+    Returns:
+        str: The selected tables' DDL, one statement per line.
+    """
+    prompt_tokens = _tokens(prompt)
+    scores = {name: len(prompt_tokens & tokens) for name, tokens in _TABLE_TOKENS.items()}
+    top = sorted((name for name, score in scores.items() if score), key=scores.get, reverse=True)[:k]
+    if not top:
+        return ""
+    return "Likely relevant tables:\n" + "\n".join(_TABLE_INDEX[name] + ";" for name in top)
 
-schema_text = schema_result["schema"]
 
 # --- Define Agents ---
 sql_junior_writer_agent = LlmAgent(
     name="sql_junior_writer_agent",
     model="gemini-2.0-flash",
     description="Generates SQL queries from user prompts.",
-    global_instruction=(
-        "You are a data assistant specializing in SQL. "
-        f"Use this schema to write syntactically correct SQL: {schema_text}"
-    ),
     instruction=(
-        "Use the provided schema in session state under 'db_schema' to write a SQL query. "
+        "You are a data assistant specializing in SQL. "
+        "Besides the SQLite built-ins (including json_extract), you can use `x REGEXP pattern` "
+        "and `levenshtein(a, b)`. "
+        f"The database has these tables: {table_list}.\n"
+        "{relevant_schema?}\n"
+        "If you need the schema, call `get_db_schema()`; results are cached for this session. "
+        "Use it to write a syntactically correct SQL query. "
         "Store your result in 'sql_query'. Do not execute it."
     ),
     output_key="sql_query",
@@ -131,8 +521,10 @@ sql_senior_writer_agent = Agent(
     model="gemini-2.0-flash",
     description="Validates and executes SQL queries.",
     instruction=(
-        "Review the SQL query in session state under 'sql_query' using this schema: "
-        f"{schema_text}. Validate it for correctness and best practices. "
+        f"The database has these tables: {table_list}.\n"
+        "Review the SQL query in session state under 'sql_query'. "
+        "If you need the schema, call `get_db_schema()`; results are cached for this session. "
+        "Validate it for correctness and best practices. "
         "If valid, execute it using 'execute_sql_query' and return the result."
     ),
     tools=[execute_sql_query, get_db_schema],
@@ -149,21 +541,122 @@ root_agent = LoopAgent(
     description="Coordinates SQL generation and execution pipeline.",
 )
 
+# --- Query Cache ---
+_WORD_RE = re.compile(r"\w+")
+_query_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+
+def _prompt_key(prompt: str) -> str:
+    """
+    Hash of the prompt lowercased and stripped of punctuation, together with the database's
+    modification time so answers are not replayed after the data changes.
+    """
+    normalized = " ".join(_WORD_RE.findall(prompt.lower()))
+    key = f"{_db_mtime(DB_PATH)}\0{normalized}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _get_cached_response(key: str) -> str | None:
+    entry = _query_cache.get(key)
+    if entry is None:
+        return None
+    expiry_ts, response_text = entry
+    if time.monotonic() >= expiry_ts:
+        del _query_cache[key]
+        return None
+    _query_cache.move_to_end(key)
+    return response_text
+
+
+def _cache_response(key: str, response_text: str) -> None:
+    _query_cache[key] = (time.monotonic() + QUERY_CACHE_TTL, response_text)
+    _query_cache.move_to_end(key)
+    if len(_query_cache) > QUERY_CACHE_SIZE:
+        _query_cache.popitem(last=False)
+
+
+# --- Query Decomposition ---
+DECOMPOSE_INSTRUCTION = (
+    "Split the following analytics question into independent sub-questions that can each be answered "
+    "with a separate SQL query, and return them as a JSON array of strings. If the question cannot be "
+    f"split, return an array containing only the original question. Return at most {MAX_SUBQUERIES} items.\n\n"
+    "Question: "
+)
+
+
+@lru_cache(maxsize=1)
+def _genai() -> genai.Client:
+    return genai.Client()
+
+
+async def decompose(prompt: str) -> List[str]:
+    """
+    Split a compound question into independent sub-questions.
+
+    Args:
+        prompt (str): Natural language query for database.
+
+    Returns:
+        list[str]: The sub-questions, or just the original prompt if it cannot be split.
+    """
+    try:
+        response = await _genai().aio.models.generate_content(
+            model="gemini-2.0-flash",
+            contents=DECOMPOSE_INSTRUCTION + prompt,
+            config=types.GenerateContentConfig(
+                temperature=0.0,
+                response_mime_type="application/json",
+                response_schema=list[str],
+            ),
+        )
+        sub_prompts = [p for p in (response.parsed or []) if isinstance(p, str) and p.strip()]
+    except Exception:
+        logger.warning("Query decomposition failed; running the prompt as-is.", exc_info=True)
+        return [prompt]
+    return sub_prompts[:MAX_SUBQUERIES] or [prompt]
+
+
 # --- Runtime Entrypoint ---
+async def _run_prompt(runner: Runner, session_service: InMemorySessionService, prompt: str, session_id: str) -> str | None:
+    """Run one prompt in its own session and return the final response text."""
+    await session_service.create_session(
+        app_name=APP_NAME,
+        user_id=USER_ID,
+        session_id=session_id,
+        state={"relevant_schema": relevant_schema(prompt)},
+    )
+    content = types.Content(role="user", parts=[types.Part(text=prompt)])
+
+    final_text = None
+    async for event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=content):
+        if event.is_final_response() and event.content:
+            final_text = event.content.parts[0].text
+    return final_text
+
+
 async def call_agent(prompt: str) -> None:
     """
     Call the root agent with a prompt and print the final output.
 
+    With DECOMPOSE_QUERIES set, compound questions are first decomposed into independent
+    sub-questions, which run concurrently in separate sessions; their answers are merged
+    into one response.
+
+    With QUERY_CACHE_TTL set, answers are cached for that many seconds, so repeating a
+    prompt skips both the LLM and the database until the database changes.
+
     Args:
         prompt (str): Natural language query for database.
     """
+    cache_key = _prompt_key(prompt) if QUERY_CACHE_TTL > 0 else None
+    cached_response = _get_cached_response(cache_key) if cache_key else None
+    if cached_response is not None:
+        logger.info("\n\n[Final Response (cached)]\n%s", cached_response)
+        return
+
     # --- Session & Runner Setup ---
     session_service = InMemorySessionService()
     artifact_service = InMemoryArtifactService()
-    session = await session_service.create_session(
-        app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
-    )
-
     runner = Runner(
         agent=root_agent,
         app_name=APP_NAME,
@@ -171,13 +664,23 @@ async def call_agent(prompt: str) -> None:
         artifact_service=artifact_service
     )
 
+    sub_prompts = await decompose(prompt) if DECOMPOSE_QUERIES else [prompt]
+    if len(sub_prompts) == 1:
+        final_text = await _run_prompt(runner, session_service, sub_prompts[0], SESSION_ID)
+    else:
+        logger.info("Running %d sub-queries: %s", len(sub_prompts), sub_prompts)
+        answers = await asyncio.gather(*(
+            _run_prompt(runner, session_service, sub_prompt, f"{SESSION_ID}_{i}")
+            for i, sub_prompt in enumerate(sub_prompts)
+        ))
+        final_text = "\n\n".join(
+            f"### {sub_prompt}\n{answer}" for sub_prompt, answer in zip(sub_prompts, answers) if answer
+        )
 
-    content = types.Content(role="user", parts=[types.Part(text=prompt)])
-    events = runner.run(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
-
-    for event in events:
-        if event.is_final_response() and event.content:
-            logger.info("\n\n[Final Response]\n%s", event.content.parts[0].text)
+    if final_text:
+        logger.info("\n\n[Final Response]\n%s", final_text)
+        if cache_key:
+            _cache_response(cache_key, final_text)
 
 
 if __name__ == "__main__":
@@ -186,7 +689,6 @@ if __name__ == "__main__":
             "List the top 10 customers by total order amount"
         )
         logger.info("Calling agent with prompt: %s", prompt)
-        import asyncio
         asyncio.run(call_agent(prompt))
     except Exception as e:
         logger.exception("An error occurred while running the agent.")
@@ -1,5 +1,6 @@
-import time
+import asyncio
 import os
+from functools import lru_cache
 from dotenv import load_dotenv, find_dotenv
 from google.genai import types
 from google import genai
@@ -10,6 +11,37 @@ from simple_agent import Agent
 # Load environment variables (e.g., GEMINI_API_KEY)
 load_dotenv(find_dotenv())
 
+
+@lru_cache(maxsize=1)
+def get_llm_client() -> genai.Client:
+    """
+    Return the process-wide Gemini client, so every agent shares one connection pool.
+    """
+    return genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+
+def _estimate_tokens(content: types.Content) -> int:
+    """
+    Approximate token count (characters / 4) of a chat turn, including function calls and responses.
+    """
+    chars = 0
+    for part in content.parts or ():
+        if part.text:
+            chars += len(part.text)
+        if part.function_call:
+            chars += len(part.function_call.name or "") + len(str(part.function_call.args or ""))
+        if part.function_response:
+            chars += len(part.function_response.name or "") + len(str(part.function_response.response or ""))
+    return chars // 4
+
+
+def _starts_turn(content: types.Content) -> bool:
+    """
+    True for a user message, as opposed to a model reply or the function responses that answer it.
+    """
+    return content.role == "user" and not any(part.function_response for part in content.parts or ())
+
+
 class LoopAgent(Agent):
     """
     A looping verbal agent that uses a large language model (LLM) to reason over context,
@@ -25,8 +57,12 @@ class LoopAgent(Agent):
         tools (list[Callable]): List of callable Python functions (tools) that the LLM can invoke.
             Tools simulate the agent's ability to act on the environment and collect information.
         terminate_criteria (Callable): Optional function to determine if the agent should stop based on memory.
-        memory (Memory): An in-memory structure storing perception, actions, outputs, and reasoning steps.
-        llm_client (genai.Client): Google Gemini LLM client for generating content.
+        memory (Memory): An in-memory structure storing perception, actions, outputs, and reasoning steps,
+            optionally bounded to `memory_max_tokens` approximate tokens.
+        contents (list[types.Content]): Incremental chat history sent to the LLM. When `memory_max_tokens`
+            is set, the oldest whole turns are dropped before each call to keep it within that budget.
+        llm_client (genai.Client): Google Gemini LLM client for generating content. Defaults to the
+            shared client returned by `get_llm_client()`.
     """
 
     def __init__(
@@ -36,48 +72,86 @@ class LoopAgent(Agent):
         max_iterations: int = 5,
         system_instruction: str = None,
         tools: list = None,
-        terminate_criteria=None
+        terminate_criteria=None,
+        llm_client: genai.Client = None,
+        memory_max_tokens: int = None
     ):
         super().__init__(name)
         self.model = model
         self.max_iterations = max_iterations
         self.terminate_criteria = terminate_criteria
         self.tools = tools or []
+        # Only the registered tools can be dispatched by name
+        self._tool_map = {tool.__name__: tool for tool in self.tools}
 
         # Attach memory to internal state
-        self.memory = Memory()
+        self.memory = Memory(max_tokens=memory_max_tokens)
         self.state["memory"] = self.memory
         self.memory.add_entry("system_instruction", system_instruction)
 
         # Gemini LLM client
-        self.llm_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        self.llm_client = llm_client or get_llm_client()
         self.system_instruction = system_instruction
+        self.config = types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            tools=self.tools,
+            automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True)
+        )
+        # Chat history sent to the model; each turn is appended once instead of re-sending the whole memory
+        self.contents: list[types.Content] = []
+        self.max_tokens = memory_max_tokens
 
-    def perceive(self):
+    async def perceive(self):
         """
         Collect input from the user, representing the agent's perception of its environment.
 
+        `input()` runs in a worker thread so it does not block the event loop.
+
         Returns:
             str: A user input string or 'exit' to terminate.
         """
-        user_input = input(f"{self.name}: What would you like to know? (type 'exit' to quit)\n> ")
+        user_input = await asyncio.to_thread(input, f"{self.name}: What would you like to know? (type 'exit' to quit)\n> ")
         return user_input.strip().lower()
 
-    def decide(self, perception=None):
+    async def decide(self, perception=None):
         """
-        Generate a response based on memory and perceived input by invoking the LLM.
+        Generate a response based on the conversation so far and the perceived input by invoking the LLM.
+
+        Only the new user turn is appended to the chat history, so earlier turns are not re-serialized.
+        The history is trimmed to `max_tokens` first, if a budget is set.
 
         Returns:
             types.GenerateContentResponse: A structured decision that may include tool calls.
         """
-        return self.llm_client.models.generate_content(
-            contents=str(self.memory),
+        if perception:
+            self.contents.append(types.Content(role="user", parts=[types.Part(text=perception)]))
+        if self.max_tokens is not None:
+            self._trim_contents()
+        response = await self.llm_client.aio.models.generate_content(
+            contents=self.contents,
             model=self.model,
-            config=types.GenerateContentConfig(
-                tools=self.tools,
-                automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True)
-            )
+            config=self.config
         )
+        if response.candidates and response.candidates[0].content:
+            self.contents.append(response.candidates[0].content)
+        return response
+
+    def _trim_contents(self):
+        """
+        Drops the oldest turns from the chat history until it fits within `max_tokens`.
+
+        A turn is a user message plus the model replies, function calls and function responses
+        that follow it, so a function call is never separated from its response. The latest
+        turn is always kept.
+        """
+        tokens = sum(_estimate_tokens(content) for content in self.contents)
+        while tokens > self.max_tokens:
+            # The next turn starts at the first user message after the oldest one
+            end = next((i for i in range(1, len(self.contents)) if _starts_turn(self.contents[i])), None)
+            if end is None:
+                break
+            tokens -= sum(_estimate_tokens(content) for content in self.contents[:end])
+            del self.contents[:end]
 
     def act(self, decision):
         """
@@ -90,9 +164,12 @@ class LoopAgent(Agent):
             decision (GenerateContentResponse): The LLM output including text or tool calls.
         """
         if decision.function_calls:
+            function_responses = []
             for call in decision.function_calls:
                 output = self._execute_tool(call.name, call.args)
                 self.memory.add_entry("context", output.get("result", output.get("error_message")))
+                function_responses.append(types.Part.from_function_response(name=call.name, response=output))
+            self.contents.append(types.Content(role="user", parts=function_responses))
         else:
             self.memory.add_entry("model_output", decision.text)
             print(f"{self.name}: {decision.text}")
@@ -110,17 +187,23 @@ class LoopAgent(Agent):
         Returns:
             dict: Result or error message from the tool.
         """
+        tool = self._tool_map.get(name)
+        if tool is None:
+            return {
+                "status": "error",
+                "error_message": f"Unknown tool '{name}'"
+            }
         try:
-            return globals()[name](**args)
+            return tool(**args)
         except Exception as e:
             return {
                 "status": "error",
                 "error_message": f"Failed to execute '{name}': {e}"
             }
 
-    def run(self, initial_input=None):
+    async def run(self, initial_input=None):
         """
-        Execute the main agentic loop.
+        Execute the main agentic loop. Several agents can run concurrently on one event loop.
 
         This function:
         - Repeatedly collects input (perceive),
@@ -136,14 +219,14 @@ class LoopAgent(Agent):
         iteration = 0
 
         while iteration < self.max_iterations:
-            perception = initial_input or self.perceive()
+            perception = initial_input or await self.perceive()
 
             if perception == "exit":
                 print(f"[bold red]{self.name}: Exiting.[/bold red]")
                 break
 
             self.memory.add_entry("user_question", perception)
-            decision = self.decide(perception)
+            decision = await self.decide(perception)
             self.act(decision)
 
             if self.terminate_criteria and self.terminate_criteria(self.memory):
@@ -151,7 +234,6 @@ class LoopAgent(Agent):
                 break
 
             iteration += 1
-            time.sleep(0.5)
 
         print(f"\n[blue]{self.name}: Loop ended after {iteration} iteration(s).[/blue]")
 
@@ -220,7 +302,7 @@ if __name__ == '__main__':
         )
     )
 
-    agent.run("What's the time and weather in New York?")
+    asyncio.run(agent.run("What's the time and weather in New York?"))
 
     # Display final model output (cleaned)
     final_output = agent.memory.get_entry("model_output")
@@ -1,5 +1,5 @@
 from numpy.ma.core import outer
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 import typing
 
 
@@ -29,10 +29,42 @@ class Memory(BaseModel):
     """
     Represents the memory storage, organized into sections with entries.
 
+    When `max_tokens` is set the memory behaves like a ring buffer: once the approximate
+    token count (characters / 4) exceeds the budget, the oldest entries are evicted,
+    except those in `pinned_sections`.
+
     Attributes:
         sections (List[MemorySection]): List of named memory sections.
+        max_tokens (int | None): Approximate token budget, or None for unbounded memory.
+        pinned_sections (Set[str]): Sections whose entries are never evicted.
     """
     sections: typing.List[MemorySection] = []
+    max_tokens: typing.Optional[int] = None
+    pinned_sections: typing.Set[str] = {"system_instruction"}
+
+    # Entries in insertion order as (section, entry) pairs, and their approximate token total
+    _history: typing.List[typing.Tuple[MemorySection, MemoryEntry]] = PrivateAttr(default_factory=list)
+    _tokens: int = PrivateAttr(0)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return len(text or "") // 4
+
+    def _evict(self):
+        """
+        Drops the oldest unpinned entries until the memory fits within `max_tokens`.
+        """
+        i = 0
+        while self._tokens > self.max_tokens and i < len(self._history):
+            section, entry = self._history[i]
+            if section.name in self.pinned_sections:
+                i += 1
+                continue
+            del self._history[i]
+            section.entries.remove(entry)
+            self._tokens -= self._estimate_tokens(entry.text)
+            if not section.entries:
+                self.sections.remove(section)
 
     def add_entry(self, section_name: str, entry_text: str):
         """
@@ -43,15 +75,20 @@ class Memory(BaseModel):
             section_name (str): Name of the section to add the entry to.
             entry_text (str): Text content of the memory entry.
         """
+        entry = MemoryEntry(text=entry_text)
         for section in self.sections:
             if section.name == section_name:
-                section.entries.append(MemoryEntry(text=entry_text))
-                return
-
-        # Create a new section if one doesn't exist yet
-        self.sections.append(
-            MemorySection(name=section_name, entries=[MemoryEntry(text=entry_text)])
-        )
+                section.entries.append(entry)
+                break
+        else:
+            # Create a new section if one doesn't exist yet
+            section = MemorySection(name=section_name, entries=[entry])
+            self.sections.append(section)
+
+        self._history.append((section, entry))
+        self._tokens += self._estimate_tokens(entry_text)
+        if self.max_tokens is not None and self._tokens > self.max_tokens:
+            self._evict()
 
     def get_entry(self, section_name: str) -> str or None:
         """
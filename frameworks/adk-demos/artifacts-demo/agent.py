@@ -1,28 +1,93 @@
+import asyncio
 import json
-import textwrap
+import os
+from pathlib import Path
 
-from google.adk.agents import Agent, SequentialAgent, LoopAgent
+from google.adk.agents import Agent, BaseAgent, SequentialAgent, LoopAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
 from google.adk.tools import google_search, ToolContext
-from typing import List, Dict
+from typing import AsyncGenerator, List, Dict
 from fpdf import FPDF
 from google.adk.tools.agent_tool import AgentTool
 from google.genai import types
+from pydantic import BaseModel
 
+try:
+    # orjson parses several times faster than the stdlib; it is optional
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
-async def create_pdf(sections: str, filename: str,  tool_context: ToolContext) -> dict:
+_JSON_DECODER = json.JSONDecoder()
+
+# A draft with every required section and at least MIN_PAPER_WORDS words ends the research loop
+REQUIRED_SECTIONS = ("Abstract", "Introduction", "Methodology", "Results", "Discussion", "Conclusion")
+MIN_PAPER_WORDS = 1000
+
+# Set SAVE_PDF_LOCALLY=1 to also write the generated PDF to the working directory (debugging)
+SAVE_PDF_LOCALLY = os.getenv("SAVE_PDF_LOCALLY", "").lower() in ("1", "true", "yes")
+
+
+class PaperSections(BaseModel):
+    """
+    Structured output of the student agent; ADK stores it in state['paper_content'] as a dict.
+    """
+    Abstract: str
+    Introduction: str
+    Methodology: str
+    Results: str
+    Discussion: str
+    Conclusion: str
+
+
+def parse_sections(sections: str) -> Dict[str, str]:
+    """
+    Parse the paper sections produced by the LLM, tolerating Markdown fences or prose
+    around the JSON object.
+
+    Args:
+        sections (str): JSON object mapping section titles to their text.
+
+    Returns:
+        dict: The parsed sections.
+
+    Raises:
+        ValueError: If no JSON object can be parsed.
     """
-    Create a PDF document from a JSON string of research paper sections.
+    try:
+        sections_dict = _json_loads(sections)
+    except ValueError:
+        # Decode the first object in place and ignore whatever follows it
+        start = sections.find("{")
+        if start == -1:
+            raise ValueError("No JSON object found in sections.")
+        sections_dict, _ = _JSON_DECODER.raw_decode(sections, start)
+
+    if not isinstance(sections_dict, dict):
+        raise ValueError("Sections must be a JSON object mapping titles to text.")
+    return sections_dict
+
+
+async def create_pdf(filename: str, tool_context: ToolContext, sections: str = "") -> dict:
+    """
+    Create a PDF document from the research paper sections.
+
+    The sections are read from `state['paper_content']`, where the student agent stores them
+    already parsed; `sections` is only needed when that state is missing.
 
     Args:
-        sections (str): JSON string containing keys like 'Abstract', 'Introduction', etc.
-        tool_context (ToolContext): Tool context for saving the PDF artifact.
+        filename (str): Name of the PDF artifact.
+        tool_context (ToolContext): Tool context for reading the paper and saving the PDF artifact.
+        sections (str): Optional JSON string containing keys like 'Abstract', 'Introduction', etc.
 
     Returns:
         dict: Status and message.
     """
     try:
-        # Parse JSON string to dict
-        sections_dict: Dict[str, str] = json.loads(sections)
+        sections_dict = tool_context.state.get("paper_content")
+        if not isinstance(sections_dict, dict):
+            sections_dict = parse_sections(sections)
 
         pdf = FPDF()
         pdf.add_page()
@@ -34,19 +99,17 @@ async def create_pdf(sections: str, filename: str,  tool_context: ToolContext) -
             pdf.cell(0, 10, text=section_title, ln=True)
             pdf.ln(1)
 
-            # Add section content (wrapped)
+            # Add section content; multi_cell wraps lines to the page width itself
             pdf.set_font("Arial", size=12)
-            wrapped_text = "\n".join(textwrap.wrap(section_text, width=100))
-            pdf.multi_cell(0, 10, text=wrapped_text)
+            pdf.multi_cell(0, 10, text=section_text)
             pdf.ln(5)
 
-        # Output PDF as bytes
-        pdf_str = pdf.output(dest='S')
-        pdf_output = pdf_str.encode('latin1') if isinstance(pdf_str, str) else bytes(pdf_str)
+        # fpdf2 returns the document as a bytearray, which is used as-is (no latin-1 round trip)
+        pdf_output = pdf.output()
 
         # Optional: Save locally for debug
-        with open(filename, "wb") as f:
-            f.write(pdf_output)
+        if SAVE_PDF_LOCALLY:
+            await asyncio.to_thread(Path(filename).write_bytes, pdf_output)
 
         # Save artifact
         await tool_context.save_artifact(
@@ -87,18 +150,47 @@ student_agent = Agent(
         "Extract key information and insights relevant to the research topic. "
         "If additional information is required, provide feedback to the search agent to refine the query. "
         "The final paper should be at least 1000 words and written at a level suitable for submission to a top-tier conference. "
-        "Structure the output as a JSON object, where each key corresponds to a standard section of a research paper: "
+        "Fill in each standard section of a research paper: "
         "`Abstract`, `Introduction`, `Methodology`, `Results`, `Discussion`, and `Conclusion`. "
         "Each section should contain well-developed, original text appropriate to its purpose."
     ),
+    output_schema=PaperSections,
     output_key='paper_content',
 )
 
+def is_paper_complete(paper_content: dict | str | None) -> bool:
+    """
+    Check locally, without an LLM call, whether a draft has every required section and
+    meets the minimum length.
+    """
+    if not paper_content:
+        return False
+    if isinstance(paper_content, dict):
+        sections_dict = paper_content
+    else:
+        try:
+            sections_dict = parse_sections(paper_content)
+        except ValueError:
+            return False
+    if any(not sections_dict.get(section) for section in REQUIRED_SECTIONS):
+        return False
+    return sum(len(str(text).split()) for text in sections_dict.values()) >= MIN_PAPER_WORDS
+
+
+class CheckPaperAndEscalate(BaseAgent):
+    """
+    Terminates the loop as soon as the draft is complete.
+    """
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        should_stop = is_paper_complete(ctx.session.state.get("paper_content"))
+        yield Event(author=self.name, actions=EventActions(escalate=should_stop))
+
+
 postdoc_agent = LoopAgent(
     name='postdoc_agent',
     description='A loop agent that coordinates the search and research agents.',
     max_iterations=3,
-    sub_agents=[search_agent, student_agent]
+    sub_agents=[search_agent, student_agent, CheckPaperAndEscalate(name="paper_checker")]
 )
 
 postdoc_agent_tool = AgentTool(agent=postdoc_agent)
@@ -111,7 +203,8 @@ root_agent = Agent(
         'You are a paper writing assistant. Your task is to compile the research findings into a well-structured academic paper. '
         'Use the provided research content to create a coherent and comprehensive document. '
         "To grab the research content, use the Postdoc Agent tool. "
-        'Once you have the content, format it into a PDF document with appropriate sections and references. '
+        'Once you have the content, call `create_pdf` to format it into a PDF document; '
+        'it reads the paper sections from session state, so you do not need to pass them. '
         'Finally, save the PDF document as an artifact named "final_paper.pdf".'
     ),
     tools=[postdoc_agent_tool, create_pdf],
@@ -1,5 +1,6 @@
 import asyncio
 import os
+import sys
 import uuid
 
 from google.adk.agents import BaseAgent
@@ -15,24 +16,45 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 
 # --- Constants ---
-APP_NAME = "doc_writing_app"
+APP_NAME = os.getenv("APP_NAME", "doc_writing_app")
+USER_ID = os.getenv("USER_ID", str(uuid.uuid4()))
 GEMINI_MODEL = "gemini-2.0-flash"
+# Maximum number of prompts in flight in call_agents_async
+BATCH_SIZE = 32
 
 # --- State Keys ---
 STATE_INITIAL_TOPIC = "quantum physics"
 STATE_CURRENT_DOC = "current_document"
 STATE_CRITICISM = "criticism"
 
+# --- Instructions ---
+# Templates share the role line and are formatted once at import
+_ROLE_TEMPLATE = sys.intern("""
+    You are a {role} AI.
+""")
+_WRITER_TEMPLATE = _ROLE_TEMPLATE + """\
+    Check the session state for '{state_doc}'.
+    If '{state_doc}' does NOT exist or is empty, write a very short (1-2 sentence) story or document based on the topic in state key '{state_topic}'.
+    If '{state_doc}' *already exists* and '{state_criticism}', refine '{state_doc}' according to the comments in '{state_criticism}'."
+    Output *only* the story or the exact pass-through message.
+    """
+_CRITIC_TEMPLATE = _ROLE_TEMPLATE + """\
+    Review the document provided in the session state key '{state_doc}'.
+    Provide 1-2 brief suggestions for improvement (e.g., "Make it more exciting", "Add more detail").
+    Output *only* the critique.
+    """
+WRITER_INSTRUCTION = sys.intern(_WRITER_TEMPLATE.format(
+    role="Creative Writer",
+    state_doc=STATE_CURRENT_DOC,
+    state_topic=STATE_INITIAL_TOPIC,
+    state_criticism=STATE_CRITICISM,
+))
+CRITIC_INSTRUCTION = sys.intern(_CRITIC_TEMPLATE.format(role="Constructive Critic", state_doc=STATE_CURRENT_DOC))
+
 writer_agent = LlmAgent(
     name="WriterAgent",
     model=GEMINI_MODEL,
-    instruction=f"""
-    You are a Creative Writer AI.
-    Check the session state for '{STATE_CURRENT_DOC}'.
-    If '{STATE_CURRENT_DOC}' does NOT exist or is empty, write a very short (1-2 sentence) story or document based on the topic in state key '{STATE_INITIAL_TOPIC}'.
-    If '{STATE_CURRENT_DOC}' *already exists* and '{STATE_CRITICISM}', refine '{STATE_CURRENT_DOC}' according to the comments in '{STATE_CRITICISM}'."
-    Output *only* the story or the exact pass-through message.
-    """,
+    instruction=WRITER_INSTRUCTION,
     description="Writes the initial document draft.",
     output_key=STATE_CURRENT_DOC # Saves output to state
 )
@@ -41,12 +63,7 @@ writer_agent = LlmAgent(
 critic_agent = LlmAgent(
     name="CriticAgent",
     model=GEMINI_MODEL,
-    instruction=f"""
-    You are a Constructive Critic AI.
-    Review the document provided in the session state key '{STATE_CURRENT_DOC}'.
-    Provide 1-2 brief suggestions for improvement (e.g., "Make it more exciting", "Add more detail").
-    Output *only* the critique.
-    """,
+    instruction=CRITIC_INSTRUCTION,
     description="Reviews the current document draft.",
     output_key=STATE_CRITICISM # Saves critique to state
 )
@@ -59,30 +76,48 @@ loop_agent = LoopAgent(
 root_agent = loop_agent
 
 
-async def call_agent_async(agent: BaseAgent, prompt: str) -> None:
+# --- Runner Setup ---
+# The services and runners are shared by every call; only the session is created per call
+_session_service = InMemorySessionService()
+_artifact_service = InMemoryArtifactService()
+_runners: dict[str, Runner] = {}
+
+
+def _get_runner(agent: BaseAgent) -> Runner:
+    """
+    Return the runner for `agent`, creating it on first use.
+    """
+    runner = _runners.get(agent.name)
+    if runner is None:
+        runner = Runner(
+            agent=agent,
+            app_name=APP_NAME,
+            session_service=_session_service,
+            artifact_service=_artifact_service,
+        )
+        _runners[agent.name] = runner
+    return runner
+
+
+async def call_agent_async(agent: BaseAgent, prompt: str, session_id: str | None = None) -> None:
     """
     Call the root agent with a prompt and print the final output using Rich panels.
 
     Args:
         agent:  The agent to be called.
         prompt (str): Natural language query for database.
+        session_id (str, optional): Session to run in. Defaults to $SESSION_ID or a new session.
     """
-    APP_NAME = os.getenv("APP_NAME", str(uuid.uuid4()))
-    USER_ID = os.getenv("USER_ID", str(uuid.uuid4()))
-    SESSION_ID = os.getenv("SESSION_ID", str(uuid.uuid4()))
-
-    session_service = InMemorySessionService()
-    artifact_service = InMemoryArtifactService()
-
-    runner = Runner(
-        agent=agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-        artifact_service=artifact_service,
-    )
-    session = await session_service.create_session(
+    SESSION_ID = session_id or os.getenv("SESSION_ID", str(uuid.uuid4()))
+
+    runner = _get_runner(agent)
+    session = await _session_service.get_session(
         app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
     )
+    if session is None:
+        session = await _session_service.create_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
+        )
 
     content = types.Content(role="user", parts=[types.Part(text=prompt)])
     events = runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
@@ -92,6 +127,26 @@ async def call_agent_async(agent: BaseAgent, prompt: str) -> None:
             response_text = event.content.parts[0].text
             print(response_text)
 
+async def call_agents_async(agent: BaseAgent, prompts: list[str], batch_size: int = BATCH_SIZE) -> list:
+    """
+    Run several prompts concurrently, each in its own session, with at most `batch_size` in flight.
+
+    Args:
+        agent: The agent to be called.
+        prompts (list[str]): The prompts to run.
+        batch_size (int): Maximum number of concurrent calls.
+
+    Returns:
+        list: One entry per prompt, None on success or the exception that call raised.
+    """
+    semaphore = asyncio.Semaphore(batch_size)
+
+    async def _call(prompt: str) -> None:
+        async with semaphore:
+            await call_agent_async(agent, prompt, session_id=str(uuid.uuid4()))
+
+    return await asyncio.gather(*(_call(prompt) for prompt in prompts), return_exceptions=True)
+
 if __name__ == '__main__':
     asyncio.run(call_agent_async(
         agent=root_agent,
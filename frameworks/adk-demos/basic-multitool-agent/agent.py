@@ -1,5 +1,7 @@
 import asyncio
+import contextlib
 import datetime
+import functools
 import os
 import uuid
 from zoneinfo import ZoneInfo
@@ -15,15 +17,17 @@ from rich import print
 
 load_dotenv(verbose=True)
 
-def get_weather(city: str) -> dict:
-    """Retrieves the current weather report for a specified city.
+APP_NAME = os.getenv("APP_NAME", str(uuid.uuid4()))
+USER_ID = os.getenv("USER_ID", str(uuid.uuid4()))
+# Maximum number of prompts in flight in call_agents_async
+BATCH_SIZE = 32
 
-    Args:
-        city (str): The name of the city for which to retrieve the weather report.
+# Time zones are loaded from tzdata once at import instead of on every call
+_TZ_CACHE: dict[str, ZoneInfo] = {"new york": ZoneInfo("America/New_York")}
 
-    Returns:
-        dict: status and result or error msg.
-    """
+
+@functools.lru_cache(maxsize=128)
+def _weather_report(city: str) -> dict:
     if city.lower() == "new york":
         return {
             "status": "success",
@@ -39,6 +43,18 @@ def get_weather(city: str) -> dict:
         }
 
 
+def get_weather(city: str) -> dict:
+    """Retrieves the current weather report for a specified city.
+
+    Args:
+        city (str): The name of the city for which to retrieve the weather report.
+
+    Returns:
+        dict: status and result or error msg.
+    """
+    return _weather_report(city)
+
+
 def get_current_time(city: str) -> dict:
     """Returns the current time in a specified city.
 
@@ -48,10 +64,8 @@ def get_current_time(city: str) -> dict:
     Returns:
         dict: status and result or error msg.
     """
-
-    if city.lower() == "new york":
-        tz_identifier = "America/New_York"
-    else:
+    tz = _TZ_CACHE.get(city.lower())
+    if tz is None:
         return {
             "status": "error",
             "error_message": (
@@ -59,10 +73,9 @@ def get_current_time(city: str) -> dict:
             ),
         }
 
-    tz = ZoneInfo(tz_identifier)
     now = datetime.datetime.now(tz)
     report = (
-        f'The current time in {city} is {now.strftime("%Y-%m-%d %H:%M:%S %Z%z")}'
+        f"The current time in {city} is {now.isoformat(sep=' ', timespec='seconds')} {now.tzname()}"
     )
     return {"status": "success", "report": report}
 
@@ -80,38 +93,79 @@ root_agent = Agent(
 )
 
 
-async def call_agent_async(agent: BaseAgent, prompt: str) -> None:
+# --- Runner Setup ---
+# The services and runners are shared by every call; only the session is created per call
+_session_service = InMemorySessionService()
+_artifact_service = InMemoryArtifactService()
+_runners: dict[str, Runner] = {}
+
+
+def _get_runner(agent: BaseAgent) -> Runner:
+    """
+    Return the runner for `agent`, creating it on first use.
+    """
+    runner = _runners.get(agent.name)
+    if runner is None:
+        runner = Runner(
+            agent=agent,
+            app_name=APP_NAME,
+            session_service=_session_service,
+            artifact_service=_artifact_service,
+        )
+        _runners[agent.name] = runner
+    return runner
+
+
+async def call_agent_async(agent: BaseAgent, prompt: str, session_id: str | None = None) -> None:
     """
     Call the root agent with a prompt and print the final output using Rich panels.
 
     Args:
         agent:  The agent to be called.
         prompt (str): Natural language query for database.
+        session_id (str, optional): Session to run in. Defaults to $SESSION_ID or a new session.
     """
-    APP_NAME = os.getenv("APP_NAME", str(uuid.uuid4()))
-    USER_ID = os.getenv("USER_ID", str(uuid.uuid4()))
-    SESSION_ID = os.getenv("SESSION_ID", str(uuid.uuid4()))
-
-    session_service = InMemorySessionService()
-    artifact_service = InMemoryArtifactService()
-
-    runner = Runner(
-        agent=agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-        artifact_service=artifact_service,
-    )
-    session = await session_service.create_session(
+    SESSION_ID = session_id or os.getenv("SESSION_ID", str(uuid.uuid4()))
+
+    runner = _get_runner(agent)
+    session = await _session_service.get_session(
         app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
     )
+    if session is None:
+        session = await _session_service.create_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
+        )
 
     content = types.Content(role="user", parts=[types.Part(text=prompt)])
     events = runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
 
-    async for event in events:
-        if event.is_final_response() and event.content:
-            response_text = event.content.parts[0].text
-            print(response_text)
+    # aclosing() finalizes the generator when we break, instead of leaving it to the GC
+    async with contextlib.aclosing(events):
+        async for event in events:
+            if event.is_final_response() and event.content:
+                print(event.content.parts[0].text)
+                # A single agent emits one final response; stop instead of awaiting the stream's end
+                break
+
+async def call_agents_async(agent: BaseAgent, prompts: list[str], batch_size: int = BATCH_SIZE) -> list:
+    """
+    Run several prompts concurrently, each in its own session, with at most `batch_size` in flight.
+
+    Args:
+        agent: The agent to be called.
+        prompts (list[str]): The prompts to run.
+        batch_size (int): Maximum number of concurrent calls.
+
+    Returns:
+        list: One entry per prompt, None on success or the exception that call raised.
+    """
+    semaphore = asyncio.Semaphore(batch_size)
+
+    async def _call(prompt: str) -> None:
+        async with semaphore:
+            await call_agent_async(agent, prompt, session_id=str(uuid.uuid4()))
+
+    return await asyncio.gather(*(_call(prompt) for prompt in prompts), return_exceptions=True)
 
 if __name__ == '__main__':
     prompt = (
@@ -0,0 +1,266 @@
+"""
+Helpers shared by the effective-pattern demos: task configuration, the generator agent factory,
+guardrail building blocks, console output and the runner / call_agent scaffolding.
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+from contextlib import aclosing, asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Iterable, List, Optional
+
+from google.adk import Runner
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from rich.console import Console
+from rich.logging import RichHandler
+from rich.panel import Panel
+from rich.text import Text
+
+# Responses are cached only at or below LLM_CACHE_MAX_TEMPERATURE (default 0); set it to 1 to cache the demos
+from llm_cache import cache_model_response, cached_response
+
+# Every demo renders its agents' role line from this one template, so the text cannot drift.
+# ADK only sends the root agent's global_instruction, so the line is prepended to each instruction
+ROLE_LINE_TMPL = sys.intern("You are a {role}.")
+
+# Rich panels only help on an interactive terminal; redirected output gets plain lines
+RICH_OUTPUT = sys.stdout.isatty()
+
+USER_ID = "dev_user_01"
+SESSION_ID = "dev_user_session_01"
+# STREAM_OUTPUT=1 prints model tokens as they arrive instead of waiting for each final response
+STREAM_OUTPUT = os.getenv("STREAM_OUTPUT", "0") == "1"
+RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE if STREAM_OUTPUT else StreamingMode.NONE)
+
+
+# --- Task Configuration ---
+@dataclass(frozen=True, slots=True)
+class TaskConfig:
+    """
+    Static definition of one generator agent; see create_llm_agent.
+    """
+    name: str
+    description: str
+    instruction: str
+    output_key: str
+    temperature: float = 1.0
+    model: str = "gemini-2.0-flash"
+    role_line: Optional[str] = None
+
+
+@lru_cache(maxsize=None)
+def render_role_line(role: str) -> str:
+    """
+    Render the role line for `role`. Agents with the same role share one interned string.
+    """
+    return sys.intern(ROLE_LINE_TMPL.format(role=role.casefold()))
+
+
+def with_role_line(config: TaskConfig) -> str:
+    """
+    Return the instruction of `config` preceded by its role line.
+    """
+    role_line = config.role_line or render_role_line(config.name.replace("_", " "))
+    return f"{role_line}\n{config.instruction}"
+
+
+def create_llm_agent(config: TaskConfig) -> LlmAgent:
+    """
+    Create a generator agent from `config`, with its responses served from and stored in the cache.
+    """
+    return LlmAgent(
+        name=config.name,
+        description=config.description,
+        model=config.model,
+        instruction=with_role_line(config),
+        output_key=config.output_key,
+        generate_content_config=types.GenerateContentConfig(temperature=config.temperature),
+        before_model_callback=cached_response,
+        after_model_callback=cache_model_response,
+    )
+
+
+# --- Guardrail ---
+def compile_blocked_keywords(keywords: Iterable[str]) -> re.Pattern:
+    """
+    Compile `keywords` into one case-insensitive, whole-word pattern, so a prompt is scanned in a
+    single pass instead of lowercasing a copy of it.
+    """
+    return re.compile(r"\b(" + "|".join(map(re.escape, keywords)) + r")\b", re.IGNORECASE)
+
+
+def extract_prompt(content: Optional[types.Content]) -> str:
+    """
+    Return the first text part of the user message, or "" if there is none.
+    """
+    for part in (content.parts if content else None) or ():
+        if part.text:
+            return part.text
+    return ""
+
+
+# --- Output ---
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return the logger for a demo module. Per-call tracing is off unless LOG_LEVEL=DEBUG, so the
+    guardrail renders nothing on the hot path.
+    """
+    logger = logging.getLogger(name)
+    if os.getenv("LOG_LEVEL", "").upper() == "DEBUG" and not logger.handlers:
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(RichHandler())
+    return logger
+
+
+def framed(text: str, title: str):
+    return Panel.fit(text, title=title) if RICH_OUTPUT else text
+
+
+# Rendering rich panels is slow, so during a run they are queued and printed from a worker
+# thread by a single background task; the event loop keeps streaming in the meantime
+_log_queue: ContextVar[Optional[asyncio.Queue]] = ContextVar("log_queue", default=None)
+_console = Console()
+
+
+def log(renderable, end: str = "\n") -> None:
+    """
+    Queue `renderable` for the console writer of the current run, or print it directly outside a run.
+    """
+    queue = _log_queue.get()
+    if queue is None:
+        _console.print(renderable, end=end)
+    else:
+        queue.put_nowait((renderable, end))
+
+
+async def _console_writer(queue: asyncio.Queue) -> None:
+    while (item := await queue.get()) is not None:
+        renderable, end = item
+        await asyncio.to_thread(_console.print, renderable, end=end)
+
+
+@asynccontextmanager
+async def console_output() -> AsyncIterator[None]:
+    """
+    Send everything `log`ged in this task to a background console writer, and flush it on exit.
+    """
+    queue = asyncio.Queue()
+    token = _log_queue.set(queue)
+    writer = asyncio.create_task(_console_writer(queue))
+    try:
+        yield
+    finally:
+        _log_queue.reset(token)
+        queue.put_nowait(None)
+        await writer
+
+
+@lru_cache(maxsize=1024)
+def user_content(prompt: str) -> types.Content:
+    """
+    Return the user message for `prompt`; repeated prompts reuse the same, never mutated, instance.
+    """
+    return types.Content(role="user", parts=[types.Part(text=prompt)])
+
+
+# --- Running a Demo ---
+def make_runner(root_agent: BaseAgent, app_name: str) -> Runner:
+    """
+    Return a runner for `root_agent` with in-memory services. It is shared by every call; only the
+    session is created per call.
+    """
+    return Runner(
+        agent=root_agent,
+        app_name=app_name,
+        session_service=InMemorySessionService(),
+        artifact_service=InMemoryArtifactService(),
+    )
+
+
+async def call_agent(
+    runner: Runner,
+    prompt: str,
+    session_id: str = SESSION_ID,
+    is_last: Optional[Callable[[Event], bool]] = None,
+    expected_keys: frozenset[str] = frozenset(),
+) -> None:
+    """
+    Send `prompt` to the runner's root agent, print every final response and then the session state.
+
+    Args:
+        runner (Runner): Runner created with make_runner.
+        prompt (str): The user prompt.
+        session_id (str): Session to run in; created if it does not exist yet.
+        is_last (Callable[[Event], bool], optional): Called with each final response; returning True
+            stops reading events, for agents that are known to produce nothing after it.
+        expected_keys (frozenset[str]): State keys the run should fill; missing ones are reported.
+    """
+    session_service = runner.session_service
+    session = await session_service.get_session(app_name=runner.app_name, user_id=USER_ID, session_id=session_id)
+    if session is None:
+        await session_service.create_session(app_name=runner.app_name, user_id=USER_ID, session_id=session_id)
+
+    async with console_output():
+        log(framed(f"[bold white]User Prompt:[/bold white] {prompt}", "👤"))
+        content = user_content(prompt)
+        streamed = False
+        # Closing the stream on exit lets ADK finish its cleanup in this task if we stop early
+        async with aclosing(runner.run_async(
+            user_id=USER_ID, session_id=session_id, new_message=content, run_config=RUN_CONFIG
+        )) as events:
+            async for event in events:
+                if event.partial:
+                    # A chunk of a response that is still being generated
+                    if event.content and event.content.parts and event.content.parts[0].text:
+                        log(Text(event.content.parts[0].text), end="")
+                        streamed = True
+                    continue
+                if event.is_final_response() and event.content:
+                    if streamed:
+                        log("")
+                        streamed = False
+                    else:
+                        response = event.content.parts[0].text
+                        log(framed(f"[bold green]{event.author}:[/bold green] {response}", "🤖"))
+                    if is_last is not None and is_last(event):
+                        break
+
+        # --- Inspect Session State ---
+        await inspect_state(runner, session_id, expected_keys)
+
+
+async def call_agents(runner: Runner, prompts: List[str], **kwargs) -> None:
+    """
+    Run several prompts concurrently on one event loop, each in its own session.
+    Keyword arguments are passed on to call_agent.
+    """
+    await asyncio.gather(*(
+        call_agent(runner, prompt, session_id=f"{SESSION_ID}_{index}", **kwargs)
+        for index, prompt in enumerate(prompts)
+    ))
+
+
+async def inspect_state(runner: Runner, session_id: str = SESSION_ID, expected_keys: frozenset[str] = frozenset()) -> None:
+    """
+    Print the session state, and any of `expected_keys` the run left unset.
+    """
+    user_session = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id=USER_ID, session_id=session_id
+    )
+    state = user_session.state if user_session else {}
+    log(framed("[bold yellow]Session State[/bold yellow]", "📦"))
+    for key, value in state.items():
+        log(f"[cyan]{key}[/cyan]: {value}")
+
+    missing = expected_keys - {key for key, value in state.items() if value is not None}
+    if missing:
+        log(f"[bold red]Missing task outputs:[/bold red] {', '.join(sorted(missing))}")
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import io
 
 from PIL import Image
@@ -26,6 +28,54 @@ root_agent = LlmAgent(
 )
 
 
+# --- Event Part Handlers ---
+# Each handler prints one kind of part and returns True if the part is code or a code result,
+# in which case the event is not treated as the final response
+async def _on_text(part: types.Part) -> bool:
+    if not part.text.isspace():
+        print(f"  Text: '{part.text.strip()}'")
+    return False
+
+
+async def _on_executable_code(part: types.Part) -> bool:
+    print(f"  Debug: Agent generated code:\n```python\n{part.executable_code.code}\n```")
+    return True
+
+
+async def _on_code_execution_result(part: types.Part) -> bool:
+    result = part.code_execution_result
+    print(f"  Debug: Code Execution Result: {result.outcome} - Output:\n{result.output}")
+    return True
+
+
+async def _on_inline_data(part: types.Part) -> bool:
+    print(f"  Debug: Inline Data: {part.inline_data.mime_type}")
+    if part.inline_data.mime_type == "image/png":
+        # Decoding and opening the viewer block, so keep them off the event loop
+        await asyncio.to_thread(_show_image, part.inline_data.data)
+    return False
+
+
+def _show_image(image_data: bytes) -> None:
+    Image.open(io.BytesIO(image_data)).show()
+
+
+# Text parts are by far the most common, so they are checked first
+_PART_HANDLERS = (
+    ("text", _on_text),
+    ("executable_code", _on_executable_code),
+    ("code_execution_result", _on_code_execution_result),
+    ("inline_data", _on_inline_data),
+)
+
+
+async def _handle_part(part: types.Part) -> bool:
+    for attr, handler in _PART_HANDLERS:
+        if getattr(part, attr):
+            return await handler(part)
+    return False
+
+
 async def call_agent(prompt: str):
     """
     Send user input to the orchestrator agent and stream responses.
@@ -47,40 +97,26 @@ async def call_agent(prompt: str):
     content = types.Content(role="user", parts=[types.Part(text=prompt)])
     events = runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
 
-    async for event in events:
-        # --- Check for specific parts FIRST ---
-        has_specific_part = False
-        if event.content and event.content.parts:
-            for part in event.content.parts:  # Iterate through all parts
-                if part.executable_code:
-                    # Access the actual code string via .code
-                    print(f"  Debug: Agent generated code:\n```python\n{part.executable_code.code}\n```")
-                    has_specific_part = True
-                elif part.code_execution_result:
-                    # Access outcome and output correctly
-                    print(
-                        f"  Debug: Code Execution Result: {part.code_execution_result.outcome} - Output:\n{part.code_execution_result.output}")
-                    has_specific_part = True
-                elif part.inline_data:
-                    print(f"  Debug: Inline Data: {part.inline_data.mime_type}")
-                    if part.inline_data.mime_type == "image/png":
-                        # Access the image data and display it
-                        image_data = part.inline_data.data
-                        image = Image.open(io.BytesIO(image_data))
-                        image.show()
-                # Also print any text parts found in any event for debugging
-                elif part.text and not part.text.isspace():
-                    print(f"  Text: '{part.text.strip()}'")
-                    # Do not set has_specific_part=True here, as we want the final response logic below
-
-        # --- Check for final response AFTER specific parts ---
-        # Only consider it final if it doesn't have the specific code parts we just handled
-        if not has_specific_part and event.is_final_response():
-            if event.content and event.content.parts and event.content.parts[0].text:
-                final_response_text = event.content.parts[0].text.strip()
-                print(f"==> Final Agent Response: {final_response_text}")
-            else:
-                print("==> Final Agent Response: [No text content in final event]")
+    # aclosing() finalizes the generator when we break, instead of leaving it to the GC
+    async with contextlib.aclosing(events):
+        async for event in events:
+            parts = event.content.parts if event.content else None
+            # --- Check for specific parts FIRST ---
+            has_specific_part = False
+            if parts:
+                for part in parts:
+                    if await _handle_part(part):
+                        has_specific_part = True
+
+            # --- Check for final response AFTER specific parts ---
+            # Only consider it final if it doesn't have the specific code parts we just handled
+            if not has_specific_part and event.is_final_response():
+                if parts and parts[0].text:
+                    print(f"==> Final Agent Response: {parts[0].text.strip()}")
+                else:
+                    print("==> Final Agent Response: [No text content in final event]")
+                # Nothing follows the final response of a single agent
+                break
 
 
 # --- Entry Point ---
@@ -94,5 +130,4 @@ if __name__ == '__main__':
         "Generates an array of 1000 random numbers from a normal distribution with mean 0 and standard deviation 1, "
         "create a histogram of the data, and "
         "save the histogram as a PNG file plot.png")
-    import asyncio
     asyncio.run(cor)
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Persistent response cache shared by the effective-pattern demos.
+
+Responses are stored in SQLite, keyed by a SHA-256 digest of everything that determines the
+model output: agent, model, temperature, system instruction and conversation. Only requests at
+or below LLM_CACHE_MAX_TEMPERATURE are cached, since replaying a high-temperature answer would
+hide the variety the sampling is meant to produce. The threshold defaults to 0 and the demos
+sample at 0.5-1.0, so the cache is off until it is raised, e.g. LLM_CACHE_MAX_TEMPERATURE=1.
+The SQLite file is only created once a request qualifies.
+
+Exact matches are checked first. On a miss, the conversation is embedded and compared with the
+cached conversations of the same agent setup, so near-duplicates such as "robots" and "a robot"
+reuse a response once their cosine similarity reaches LLM_CACHE_SIMILARITY.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextvars import ContextVar
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+from google import genai
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", Path.home() / ".cache" / "adk-demos" / "llm_cache.sqlite"))
+CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0"))
+SIMILARITY_THRESHOLD = float(os.getenv("LLM_CACHE_SIMILARITY", "0.92"))
+EMBEDDING_MODEL = os.getenv("LLM_CACHE_EMBEDDING_MODEL", "text-embedding-004")
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    A tiny key/value store for model responses backed by a SQLite file, with an embedding index
+    per scope (agent, model, temperature and instruction) for similarity lookups.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Parallel agents may run callbacks from worker threads, so one connection is shared behind a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, scope TEXT NOT NULL, vector BLOB NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        # scope -> (keys, unit vectors stacked row-wise), loaded from the database on first use
+        self._indexes: dict[str, tuple[list[str], np.ndarray]] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, text: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO responses (key, text) VALUES (?, ?)", (key, text))
+
+    def nearest(self, scope: str, vector: np.ndarray) -> tuple[Optional[str], float]:
+        """
+        Return the key of the most similar cached entry in `scope` and its cosine similarity.
+        """
+        with self._lock:
+            keys, matrix = self._index(scope)
+            if not keys:
+                return None, 0.0
+            scores = matrix @ vector
+        best = int(scores.argmax())
+        return keys[best], float(scores[best])
+
+    def add_embedding(self, scope: str, key: str, vector: np.ndarray) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, scope, vector) VALUES (?, ?, ?)",
+                (key, scope, vector.tobytes()),
+            )
+            keys, matrix = self._index(scope)
+            if key not in keys:
+                self._indexes[scope] = (keys + [key], np.vstack([matrix, vector]) if keys else vector[None, :])
+
+    def _index(self, scope: str) -> tuple[list[str], np.ndarray]:
+        index = self._indexes.get(scope)
+        if index is None:
+            rows = self._conn.execute("SELECT key, vector FROM embeddings WHERE scope = ?", (scope,)).fetchall()
+            keys = [key for key, _ in rows]
+            matrix = np.vstack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows]) if rows else np.empty((0, 0))
+            index = self._indexes[scope] = (keys, matrix)
+        return index
+
+
+class _Pending(NamedTuple):
+    key: str
+    scope: str
+    vector: Optional[np.ndarray]
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+_client: Optional[genai.Client] = None
+
+# Request in flight, handed from the before- to the after-model callback. Each agent runs in its
+# own task, so parallel agents never see each other's request.
+_pending: ContextVar[Optional[_Pending]] = ContextVar("llm_cache_pending", default=None)
+
+# Cacheable requests whose model call is in flight, by cache key. Concurrent duplicates await the
+# first caller's response instead of calling the model again; None means nothing was cached.
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def _digest(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _request_scope(agent_name: str, llm_request: LlmRequest) -> Optional[dict]:
+    """
+    Return everything but the conversation that determines the response, or None if the
+    request should not be cached.
+    """
+    config = llm_request.config
+    temperature = config.temperature if config and config.temperature is not None else 1.0
+    if temperature > CACHE_MAX_TEMPERATURE:
+        return None
+    return {
+        "agent": agent_name,
+        "model": llm_request.model,
+        "temp": temperature,
+        "instr": str(config.system_instruction) if config else None,
+    }
+
+
+async def _embed(llm_request: LlmRequest) -> np.ndarray:
+    global _client
+    if _client is None:
+        _client = genai.Client()
+    text = "\n".join(part.text for content in llm_request.contents for part in content.parts or () if part.text)
+    result = await _client.aio.models.embed_content(model=EMBEDDING_MODEL, contents=text)
+    vector = np.asarray(result.embeddings[0].values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _get_cache() -> LLMCache:
+    # Opened on the first cacheable request, so importing a demo leaves the disk untouched
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(CACHE_PATH)
+    return _cache
+
+
+def _response(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def _release(key: str, text: Optional[str]) -> None:
+    """
+    Hand `text` to every caller waiting on the in-flight request `key`.
+    """
+    future = _inflight.pop(key, None)
+    if future is not None and not future.done():
+        future.set_result(text)
+
+
+async def cached_response(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    Return the cached response for `llm_request`, or None on a miss so the model is called.
+    Use it as an agent's before_model_callback.
+    """
+    _pending.set(None)
+    scope = _request_scope(callback_context.agent_name, llm_request)
+    if scope is None:
+        return None
+    key = _digest({**scope, "contents": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents]})
+    cache = _get_cache()
+    text = cache.get(key)
+    if text is not None:
+        return _response(text)
+
+    future = _inflight.get(key)
+    if future is not None:
+        # The same request is already being answered; share its response
+        text = await asyncio.shield(future)
+        if text is not None:
+            return _response(text)
+    else:
+        _inflight[key] = asyncio.get_running_loop().create_future()
+        # Never leave waiters hanging if the model call fails or is cancelled
+        asyncio.current_task().add_done_callback(lambda _: _release(key, None))
+
+    # Exact miss: fall back to the closest conversation seen with the same agent setup. The
+    # embedding model is part of the scope, so vectors of different dimensions never meet
+    scope_key = _digest({**scope, "embedding_model": EMBEDDING_MODEL})
+    try:
+        vector = await _embed(llm_request)
+    except Exception:
+        # Embedding is best-effort; without it the cache only serves exact matches
+        logger.warning("Embedding the request failed; skipping the similarity lookup.", exc_info=True)
+        vector = None
+    if vector is not None:
+        try:
+            nearest_key, similarity = cache.nearest(scope_key, vector)
+        except Exception:
+            logger.warning("Similarity lookup failed; treating it as a miss.", exc_info=True)
+            nearest_key, similarity = None, 0.0
+        if nearest_key is not None and similarity >= SIMILARITY_THRESHOLD:
+            text = cache.get(nearest_key)
+            if text is not None:
+                _release(key, text)
+                return _response(text)
+    _pending.set(_Pending(key, scope_key, vector))
+    return None
+
+
+def cache_model_response(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """
+    after_model_callback that stores plain text responses under the key of their request.
+    """
+    pending = _pending.get()
+    if pending is None or llm_response.partial:
+        return None
+    parts = llm_response.content.parts if llm_response.content else None
+    text = None
+    # Tool calls and other non-text parts cannot be replayed as text, so only pure text is cached
+    if parts and all(part.text is not None and not part.thought for part in parts):
+        text = "".join(part.text for part in parts)
+        cache = _get_cache()
+        cache.set(pending.key, text)
+        if pending.vector is not None:
+            cache.add_embedding(pending.scope, pending.key, pending.vector)
+    _pending.set(None)
+    _release(pending.key, text)
+    return None
@@ -1,94 +1,112 @@
-from typing import AsyncGenerator, List, Dict, Optional
+import asyncio
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 from rich import print
-from rich.panel import Panel
 
-from google.adk import Runner
-from google.adk.agents import LlmAgent, LoopAgent, BaseAgent
+from google.adk.agents import LlmAgent, ParallelAgent
 from google.adk.agents.callback_context import CallbackContext
-from google.adk.agents.invocation_context import InvocationContext
-from google.adk.artifacts import InMemoryArtifactService
-from google.adk.models import LlmRequest, LlmResponse
-from google.adk.sessions import InMemorySessionService
-from google.adk.events import Event, EventActions
 from google.genai import types
 
+# The shared helpers live in the effective-patterns folder, which is not importable from here
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from _common import (  # noqa: E402
+    TaskConfig,
+    call_agents,
+    compile_blocked_keywords,
+    extract_prompt,
+    make_runner,
+    with_role_line,
+)
+# Responses are cached only at or below LLM_CACHE_MAX_TEMPERATURE (default 0); set it to 1 to cache this demo
+from llm_cache import cache_model_response, cached_response  # noqa: E402
+
 # Load .env file
 load_dotenv()
 
 
 # --- Task Definitions ---
-TASK_CONFIGS: List[Dict[str, str]] = [
-    {
-        "name": "joke_generator",
-        "instruction": "Generate a joke based on the user prompt",
-        "output_key": "joke"
-    },
-    {
-        "name": "song_generator",
-        "instruction": "Generate a song based on the user prompt",
-        "output_key": "song"
-    },
-    {
-        "name": "poem_generator",
-        "instruction": "Generate a poem based on the user prompt",
-        "output_key": "poem"
-    },
-]
+# Every task handler shares the same instruction shape; only the output kind differs
+_TASK_INSTRUCTION_TEMPLATE = sys.intern("Generate a {output_key} based on the user prompt")
+
+TASK_CONFIGS: Tuple[TaskConfig, ...] = (
+    TaskConfig(
+        name="joke_generator",
+        description="Generate a joke",
+        instruction=_TASK_INSTRUCTION_TEMPLATE.format(output_key="joke"),
+        output_key="joke",
+    ),
+    TaskConfig(
+        name="song_generator",
+        description="Generate a song",
+        instruction=_TASK_INSTRUCTION_TEMPLATE.format(output_key="song"),
+        output_key="song",
+    ),
+    TaskConfig(
+        name="poem_generator",
+        description="Generate a poem",
+        instruction=_TASK_INSTRUCTION_TEMPLATE.format(output_key="poem"),
+        output_key="poem",
+    ),
+)
 
 # --- Guardrail Callback ---
-def on_before_model_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+BLOCKED_KEYWORDS = ["bruno"]
+_BLOCKED_RE = compile_blocked_keywords(BLOCKED_KEYWORDS)
+
+def on_before_agent_callback(callback_context: CallbackContext) -> Optional[types.Content]:
     """
-    Intercepts the prompt before sending it to the model. Useful for filtering or logging.
-    Blocks LLM call if restricted keyword is present.
+    Checks the user prompt once per turn, before any worker runs.
+    Skips the whole run if restricted keyword is present.
     """
-    prompt = llm_request.contents[0].parts[0].text
-    if "bruno" in prompt.lower():
-        return LlmResponse(
-            content=types.Content(
-                role="model",
-                parts=[types.Part(text="LLM call was blocked. We don't talk about Bruno!!")],
-            )
+    prompt = extract_prompt(callback_context.user_content)
+    if _BLOCKED_RE.search(prompt):
+        return types.Content(
+            role="model",
+            parts=[types.Part(text="LLM call was blocked. We don't talk about Bruno!!")],
         )
     return None
 
 # --- Agent Factory ---
-def create_task_handler_agent(task: Dict[str, str]) -> LlmAgent:
+@lru_cache(maxsize=None)
+def _generation_config(temperature: float) -> types.GenerateContentConfig:
+    """
+    Return one shared config per temperature. ADK deep-copies the config into each request,
+    so agents can share it safely.
+    """
+    return types.GenerateContentConfig(temperature=temperature)
+
+
+def create_task_handler_agent(task: TaskConfig) -> LlmAgent:
     """
     Creates an LLM Agent from a task configuration dictionary.
     Each task must include: name, instruction, and output_key.
     """
     return LlmAgent(
-        name=task["name"],
-        description=f"Generate a {task['output_key']}",
-        model=task.get("model", "gemini-2.0-flash"),
-        global_instruction=task.get("global_instruction", f"You are a {task['output_key']} generator."),
-        instruction=task["instruction"],
-        output_key=task["output_key"],
-        generate_content_config=types.GenerateContentConfig(
-            temperature=task.get("temperature", 1.0)
-        ),
-        before_model_callback=on_before_model_callback,
+        name=task.name,
+        description=task.description,
+        model=task.model,
+        instruction=with_role_line(task),
+        output_key=task.output_key,
+        generate_content_config=_generation_config(task.temperature),
+        before_model_callback=cached_response,
+        after_model_callback=cache_model_response,
     )
 
 # --- Create Agents from Configs ---
-task_handler_agents = [create_task_handler_agent(task) for task in TASK_CONFIGS]
-
-# --- Generic CheckCondition Agent ---
-class CheckCondition(BaseAgent):
-    output_keys : List[str] = []
-
-    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
-        is_done = all(ctx.session.state.get(key) is not None for key in self.output_keys)
-        yield Event(author=self.name, actions=EventActions(escalate=is_done))
+task_handler_agents = tuple(create_task_handler_agent(task) for task in TASK_CONFIGS)
 
 # --- Setup Orchestrator Agent ---
-output_keys = [task["output_key"] for task in TASK_CONFIGS]
+# Used after a run to verify that every task produced its output
+output_keys = frozenset(task.output_key for task in TASK_CONFIGS)
 
-orchestrator_agent = LoopAgent(
+# The workers are independent, so they are dispatched concurrently in a single step
+orchestrator_agent = ParallelAgent(
     name="coordinator_agent",
-    max_iterations=10,
-    sub_agents=task_handler_agents + [CheckCondition(name="Checker", output_keys=output_keys)]
+    sub_agents=task_handler_agents,
+    before_agent_callback=on_before_agent_callback,
 )
 
 # --- Set root agent for the web user interface ---
@@ -96,66 +114,15 @@ root_agent = orchestrator_agent
 
 
 
-# --- Execution Helpers ---
-async def call_agent(prompt: str):
-    """
-    Call the router agent with a user prompt and print the response.
-    """
-    # --- Session & Runner Setup ---
-    session_service = InMemorySessionService()
-    artifact_service = InMemoryArtifactService()
-
-    session = await session_service.create_session(
-        app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
-    )
-
-    runner = Runner(
-        agent=root_agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-        artifact_service=artifact_service
-    )
-
-    print(Panel.fit(f"[bold white]User Prompt:[/bold white] {prompt}", title="👤"))
-    content = types.Content(role="user", parts=[types.Part(text=prompt)])
-    events = runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
-
-    async for event in events:
-        if event.is_final_response() and event.content:
-            response = event.content.parts[0].text
-            print(Panel.fit(f"[bold green]{event.author}:[/bold green] {response}", title="🤖"))
+# --- Session & Runner Setup ---
+APP_NAME = "task_orchestrator_app"
+runner = make_runner(root_agent, APP_NAME)
 
-    # --- Inspect Session State ---
-    await inspect_state(session_service)
-
-
-async def inspect_state(session_service: InMemorySessionService):
-    """
-    Print the internal session state.
-    """
-    user_session = await session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID)
-    state = user_session.state if user_session else {}
-    print(Panel.fit("[bold yellow]Session State[/bold yellow]"))
-    for key, value in state.items():
-        print(f"[cyan]{key}[/cyan]: {value}")
 
 # --- Main Entry Point ---
 if __name__ == '__main__':
-    # --- Constants ---
-    APP_NAME = "task_orchestrator_app"
-    USER_ID = "dev_user_01"
-    SESSION_ID = "dev_user_session_01"
-
-    # --- Session & Runner Setup ---
-    session_service = InMemorySessionService()
-    artifact_service = InMemoryArtifactService()
-    session_service.create_session(
-        app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
-    )
-
-    # --- Run the agent with a sample prompt ---
-    import asyncio
+    # --- Run the agent with sample prompts ---
     try:
-        asyncio.run(call_agent("Tell me a joke, a song, and a poem about robots"))
+        asyncio.run(call_agents(runner, ["Tell me a joke, a song, and a poem about robots"], expected_keys=output_keys))
     except Exception as e:
         print(f"Error during agent execution: {e}")
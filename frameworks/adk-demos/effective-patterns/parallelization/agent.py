@@ -1,107 +1,161 @@
 import asyncio
+import os
+import sys
+from pathlib import Path
 
 from dotenv import load_dotenv
 from rich import print
 from rich.panel import Panel
-from typing import List, Dict, Optional
+from typing import Optional, Tuple
+from pydantic import BaseModel
 
-from google.adk import Runner
 from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
 from google.adk.agents.callback_context import CallbackContext
-from google.adk.artifacts import InMemoryArtifactService
-from google.adk.models import LlmRequest, LlmResponse
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
 
+# The shared helpers live in the effective-patterns folder, which is not importable from here
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from _common import (  # noqa: E402
+    TaskConfig,
+    call_agents,
+    compile_blocked_keywords,
+    create_llm_agent,
+    extract_prompt,
+    get_logger,
+    make_runner,
+    render_role_line,
+)
+# Responses are cached only at or below LLM_CACHE_MAX_TEMPERATURE (default 0); set it to 1 to cache this demo
+from llm_cache import cache_model_response, cached_response  # noqa: E402
+
 # --- Load Environment ---
 load_dotenv()
 
 # --- Constants ---
+# USE_BATCH=1 generates the joke, song, and poem in a single structured call instead of three parallel calls
+USE_BATCH = os.getenv("USE_BATCH", "0") == "1"
 BLOCKED_KEYWORDS = ["bruno"]
+_BLOCKED_RE = compile_blocked_keywords(BLOCKED_KEYWORDS)
 
 # --- Task Definitions ---
-TASK_CONFIGS: List[Dict[str, str]] = [
-    {
-        "name": "joke_generator",
-        "description": "Generate a joke",
-        "instruction": "Generate a joke based on the user prompt",
-        "output_key": "joke"
-    },
-    {
-        "name": "song_generator",
-        "description": "Generate a song",
-        "instruction": "Generate a song based on the user prompt",
-        "output_key": "song"
-    },
-    {
-        "name": "poem_generator",
-        "description": "Generate a poem",
-        "instruction": "Generate a poem based on the user prompt",
-        "output_key": "poem"
-    },
-]
+TASK_CONFIGS: Tuple[TaskConfig, ...] = (
+    TaskConfig(
+        name="joke_generator",
+        description="Generate a joke",
+        instruction="Generate a joke based on the user prompt",
+        output_key="joke",
+    ),
+    TaskConfig(
+        name="song_generator",
+        description="Generate a song",
+        instruction="Generate a song based on the user prompt",
+        output_key="song",
+    ),
+    TaskConfig(
+        name="poem_generator",
+        description="Generate a poem",
+        instruction="Generate a poem based on the user prompt",
+        output_key="poem",
+    ),
+)
+
+# --- Logging ---
+logger = get_logger(__name__)
+
 
 # --- Callback Guardrail ---
-def on_before_model_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+def on_before_agent_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Guardrail to skip the whole run for specific banned phrases; runs once per turn on the root agent.
     """
-    Guardrail to block LLM execution for specific banned phrases.
+    prompt = extract_prompt(callback_context.user_content)
+    logger.debug("agent=%s prompt=%s", callback_context.agent_name, prompt)
+
+    if match := _BLOCKED_RE.search(prompt):
+        return types.Content(
+            role="model",
+            parts=[types.Part(text=f"LLM call blocked. We don't talk about {match.group(0).capitalize()}!!")]
+        )
+    return None
+
+
+# --- Helper: Create a Single Agent for All Tasks ---
+class GeneratedPieces(BaseModel):
     """
-    prompt = llm_request.contents[0].parts[0].text.lower()
-    print(Panel.fit(f"[bold magenta]Agent:[/bold magenta] {callback_context.agent_name}\n[bold cyan]Prompt:[/bold cyan] {prompt}"))
-
-    for banned in BLOCKED_KEYWORDS:
-        if banned in prompt:
-            return LlmResponse(
-                content=types.Content(
-                    role="model",
-                    parts=[types.Part(text=f"LLM call blocked. We don't talk about {banned.capitalize()}!!")]
-                )
-            )
+    Structured output of the batched generator; ADK stores it in state['generated_pieces'] as a dict.
+    """
+    joke: str
+    song: str
+    poem: str
+
+
+def split_generated_pieces(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Copy each generated piece to its own state key, where the merger agent expects it.
+    """
+    pieces = callback_context.state.get("generated_pieces") or {}
+    for task in TASK_CONFIGS:
+        callback_context.state[task.output_key] = pieces.get(task.output_key)
     return None
 
 
-# --- Helper: Create Agent from Task Config ---
-def create_task_handler_agent(task: Dict[str, str]) -> LlmAgent:
+def create_batched_agent(tasks: Tuple[TaskConfig, ...]) -> LlmAgent:
     return LlmAgent(
-        name=task["name"],
-        description=task["description"],
+        name="BatchedGenerator",
+        description="Generate a joke, a song, and a poem in a single response based on the user prompt.",
         model="gemini-2.0-flash",
-        global_instruction=f"You are a {task['description'].lower()} generator.",
-        instruction=task["instruction"],
-        output_key=task["output_key"],
+        instruction="\n".join([
+            render_role_line("joke, song, and poem generator"),
+            *(f"- {task.output_key}: {task.instruction}" for task in tasks),
+        ]),
+        output_schema=GeneratedPieces,
+        output_key="generated_pieces",
         generate_content_config=types.GenerateContentConfig(temperature=1.0),
-        before_model_callback=on_before_model_callback
+        before_model_callback=cached_response,
+        after_model_callback=cache_model_response,
+        after_agent_callback=split_generated_pieces,
     )
 
-# --- Create Sub-agents ---
-sub_agents = [create_task_handler_agent(task) for task in TASK_CONFIGS]
 
-# --- Aggregator (Parallel Execution) ---
-aggregator_agent = ParallelAgent(
-    name="ParallelGenerator",
-    sub_agents=sub_agents,
-    description="Run joke, song, and poem generators in parallel based on the user prompt."
-)
+# --- Aggregator ---
+if USE_BATCH:
+    # One model call returns all three pieces
+    aggregator_agent = create_batched_agent(TASK_CONFIGS)
+else:
+    # Parallel execution, one model call per piece
+    aggregator_agent = ParallelAgent(
+        name="ParallelGenerator",
+        sub_agents=[create_llm_agent(task) for task in TASK_CONFIGS],
+        description="Run joke, song, and poem generators in parallel based on the user prompt."
+    )
 
 # --- Merger Agent ---
+# The rules never change, so they come first and the model provider can reuse the cached prompt
+# prefix across runs; every placeholder comes after the sentinel line
+MERGER_PREAMBLE = (
+    "You are a merger agent.\n"
+    "Your task is to merge the outputs of multiple sub-agents into a single, coherent, and structured response.\n\n"
+    "Instructions:\n"
+    "- Do **not** add any external information, context, or commentary.\n"
+    "- Use **only** the provided inputs: the joke, the song, and the poem below.\n"
+    "- Maintain the exact order and structure shown below.\n"
+    "- Do **not** include any introductory or concluding phrases.\n"
+    "- Do **not** modify, interpret, or enhance the content of the inputs.\n"
+    "- Strictly follow the format below and output only the merged content as shown.\n"
+)
+MERGER_INPUTS = (
+    "\n---INPUTS---\n"
+    "### Joke:\n{joke}\n\n"
+    "### Song:\n{song}\n\n"
+    "### Poem:\n{poem}"
+)
+
 merger_agent = LlmAgent(
     name="merger_agent",
     description="Merge the outputs of the sub-agents into a structured response.",
     model="gemini-2.0-flash",
-    global_instruction="You are a merger agent.",
-    instruction=(
-        "Your task is to merge the outputs of multiple sub-agents into a single, coherent, and structured response.\n\n"
-        "- Do **not** add any external information, context, or commentary.\n"
-        "- Use **only** the provided inputs: {joke}, {song}, and {poem}.\n"
-        "- Maintain the exact order and structure specified below.\n\n"
-        "### Joke:\n{joke}\n\n"
-        "### Song:\n{song}\n\n"
-        "### Poem:\n{poem}\n\n"
-        "Instructions:\n"
-        "- Do **not** include any introductory or concluding phrases.\n"
-        "- Do **not** modify, interpret, or enhance the content of the inputs.\n"
-        "- Strictly follow the format above and output only the merged content as shown."
-    ),
+    # ADK only sends the root agent's global_instruction, so the role line is part of the preamble
+    instruction=MERGER_PREAMBLE + MERGER_INPUTS,
     output_key="merged_response",
     generate_content_config=types.GenerateContentConfig(temperature=0.5),
 )
@@ -110,60 +164,19 @@ merger_agent = LlmAgent(
 root_agent = SequentialAgent(
     name="root_agent",
     sub_agents=[aggregator_agent, merger_agent],
-    description="Coordinates generation and merging of joke, song, and poem."
+    description="Coordinates generation and merging of joke, song, and poem.",
+    before_agent_callback=on_before_agent_callback,
 )
 
 
-# --- Execution Helpers ---
-async def call_agent(prompt: str):
-    """
-    Call the router agent with a user prompt and print the response.
-    """
-    # --- Session & Runner Setup ---
-    session_service = InMemorySessionService()
-    artifact_service = InMemoryArtifactService()
-
-    session = await session_service.create_session(
-        app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
-    )
-
-    runner = Runner(
-        agent=root_agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-        artifact_service=artifact_service
-    )
-
-    print(Panel.fit(f"[bold white]User Prompt:[/bold white] {prompt}", title="👤"))
-    content = types.Content(role="user", parts=[types.Part(text=prompt)])
-    events = runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
-
-    async for event in events:
-        if event.is_final_response() and event.content:
-            response = event.content.parts[0].text
-            print(Panel.fit(f"[bold green]{event.author}:[/bold green] {response}", title="🤖"))
-
-    # --- Inspect Session State ---
-    await inspect_state(session_service)
+# --- Session & Runner Setup ---
+APP_NAME = "joke_song_poem_generator_app"
+runner = make_runner(root_agent, APP_NAME)
 
 
-async def inspect_state(session_service: InMemorySessionService):
-    """
-    Print the internal session state.
-    """
-    user_session = await session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID)
-    state = user_session.state if user_session else {}
-    print(Panel.fit("[bold yellow]Session State[/bold yellow]"))
-    for key, value in state.items():
-        print(f"[cyan]{key}[/cyan]: {value}")
-
 # --- Main ---
 if __name__ == '__main__':
-    APP_NAME = "joke_song_poem_generator_app"
-    USER_ID = "dev_user_01"
-    SESSION_ID = "dev_user_session_01"
-
     try:
-        asyncio.run(call_agent("Please generate something funny and poetic."))
+        asyncio.run(call_agents(runner, ["Please generate something funny and poetic."]))
     except Exception as e:
         print(Panel.fit(f"[bold red]Error:[/bold red] {str(e)}", title="❌"))
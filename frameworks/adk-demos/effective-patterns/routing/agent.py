@@ -1,75 +1,78 @@
 import asyncio
+import sys
+from pathlib import Path
 
 from dotenv import load_dotenv
 from rich import print
 from rich.panel import Panel
-from typing import Optional, List, Dict
+from typing import Optional, Tuple
 
-from google.adk import Runner
 from google.adk.agents import LlmAgent
 from google.adk.agents.callback_context import CallbackContext
-from google.adk.artifacts import InMemoryArtifactService
-from google.adk.models import LlmRequest, LlmResponse
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
 
+# The shared helpers live in the effective-patterns folder, which is not importable from here
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from _common import (  # noqa: E402
+    TaskConfig,
+    call_agents,
+    compile_blocked_keywords,
+    create_llm_agent,
+    extract_prompt,
+    get_logger,
+    make_runner,
+)
+# Responses are cached only at or below LLM_CACHE_MAX_TEMPERATURE (default 0); set it to 1 to cache this demo
+from llm_cache import cache_model_response, cached_response  # noqa: E402
+
 # --- Load environment ---
 load_dotenv()
 
 # --- Constants ---
 BLOCKED_KEYWORDS = ["apple"]
+_BLOCKED_RE = compile_blocked_keywords(BLOCKED_KEYWORDS)
 
 # --- Router Config: Define Routing Sub-Agents ---
-ROUTER_CONFIG: List[Dict] = [
-    {
-        "name": "joke_generator",
-        "description": "Generate a joke",
-        "instruction": "Generate a joke based on the user prompt",
-        "output_key": "joke",
-        "temperature": 1.0
-    },
-    {
-        "name": "song_generator",
-        "description": "Generate a song",
-        "instruction": "Generate a song based on the user prompt",
-        "output_key": "song",
-        "temperature": 1.0
-    },
-    {
-        "name": "poem_generator",
-        "description": "Generate a poem",
-        "instruction": "Generate a poem based on the user prompt",
-        "output_key": "poem",
-        "temperature": 1.0
-    }
-]
+ROUTER_CONFIG: Tuple[TaskConfig, ...] = (
+    TaskConfig(
+        name="joke_generator",
+        description="Generate a joke",
+        instruction="Generate a joke based on the user prompt",
+        output_key="joke",
+        temperature=1.0,
+    ),
+    TaskConfig(
+        name="song_generator",
+        description="Generate a song",
+        instruction="Generate a song based on the user prompt",
+        output_key="song",
+        temperature=1.0,
+    ),
+    TaskConfig(
+        name="poem_generator",
+        description="Generate a poem",
+        instruction="Generate a poem based on the user prompt",
+        output_key="poem",
+        temperature=1.0,
+    ),
+)
+
+# --- Logging ---
+logger = get_logger(__name__)
+
 
 # --- Guardrail Callback ---
-def on_before_model_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
-    prompt = llm_request.contents[0].parts[0].text.lower()
-    print(Panel.fit(f"[bold magenta]Agent:[/bold magenta] {callback_context.agent_name}\n[bold cyan]Prompt:[/bold cyan] {prompt}"))
+def on_before_agent_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    prompt = extract_prompt(callback_context.user_content)
+    logger.debug("agent=%s prompt=%s", callback_context.agent_name, prompt)
 
-    for word in BLOCKED_KEYWORDS:
-        if word in prompt:
-            raise ValueError(f"❌ Prompt contains forbidden word: '{word}'. Please rephrase.")
+    if match := _BLOCKED_RE.search(prompt):
+        raise ValueError(f"❌ Prompt contains forbidden word: '{match.group(0).lower()}'. Please rephrase.")
 
     return None
 
 
-# --- Helper: Agent Factory from Router Config ---
-def create_llm_agent(config: Dict) -> LlmAgent:
-    return LlmAgent(
-        name=config["name"],
-        description=config["description"],
-        model="gemini-2.0-flash",
-        global_instruction=f"You are a {config['description'].lower()}.",
-        instruction=config["instruction"],
-        output_key=config["output_key"],
-        generate_content_config=types.GenerateContentConfig(temperature=config.get("temperature", 1.0)),
-        before_model_callback=on_before_model_callback
-    )
-
-# Create sub-agents from config
+# --- Create Sub-agents from Router Config ---
 sub_agents = [create_llm_agent(cfg) for cfg in ROUTER_CONFIG]
 
 # --- Router Agent ---
@@ -86,64 +89,28 @@ router_agent = LlmAgent(
     instruction=router_instruction,
     sub_agents=sub_agents,
     output_key="final_response",
-    before_model_callback=on_before_model_callback
+    before_agent_callback=on_before_agent_callback,
+    before_model_callback=cached_response,
+    after_model_callback=cache_model_response,
 )
 
 # --- Set root agent for the web user interface ---
 root_agent = router_agent
 
-# --- Execution Helpers ---
-async def call_agent(prompt: str):
-    """
-    Call the router agent with a user prompt and print the response.
-    """
-    # --- Session & Runner Setup ---
-    session_service = InMemorySessionService()
-    artifact_service = InMemoryArtifactService()
-
-    session = await session_service.create_session(
-        app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
-    )
-
-    runner = Runner(
-        agent=router_agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-        artifact_service=artifact_service
-    )
-
-    print(Panel.fit(f"[bold white]User Prompt:[/bold white] {prompt}", title="👤"))
-    content = types.Content(role="user", parts=[types.Part(text=prompt)])
-    events = runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
-
-    async for event in events:
-        if event.is_final_response() and event.content:
-            response = event.content.parts[0].text
-            print(Panel.fit(f"[bold green]{event.author}:[/bold green] {response}", title="🤖"))
-
-    # --- Inspect Session State ---
-    await inspect_state(session_service)
-
-
-async def inspect_state(session_service: InMemorySessionService):
-    """
-    Print the internal session state.
-    """
-    user_session = await session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID)
-    state = user_session.state if user_session else {}
-    print(Panel.fit("[bold yellow]Session State[/bold yellow]"))
-    for key, value in state.items():
-        print(f"[cyan]{key}[/cyan]: {value}")
+# --- Session & Runner Setup ---
+APP_NAME = "joke_generator_app"
+runner = make_runner(router_agent, APP_NAME)
 
 
 # --- Entry Point ---
 if __name__ == '__main__':
-    APP_NAME = "joke_generator_app"
-    USER_ID = "dev_user_01"
-    SESSION_ID = "dev_user_session_01"
-
     try:
-        topic = "robots"
-        asyncio.run(call_agent(f"write a poem about {topic}"))
+        topics = ["robots"]
+        asyncio.run(call_agents(
+            runner,
+            [f"write a poem about {topic}" for topic in topics],
+            # The router may reply before transferring, so only a routed agent's answer ends the turn
+            is_last=lambda event: event.author != router_agent.name,
+        ))
     except Exception as e:
         print(Panel.fit(f"[bold red]Error:[/bold red] {str(e)}", title="❌"))
@@ -1,17 +1,44 @@
+import functools
+import json
 import os
-import uuid
+import sys
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 
 from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.events import Event
 from google.adk.runners import InMemorySessionService, InMemoryRunner
+from google.adk.sessions import BaseSessionService, Session
 from google.adk.tools import ToolContext, LongRunningFunctionTool
-from typing import Any, Dict, Union
+from typing import Any, Dict, Optional, Union
 import asyncio
 from google.genai import types
 from dotenv import load_dotenv, find_dotenv
 from rich import print
 
-load_dotenv(find_dotenv())
+try:
+    # uvloop serves socket reads in C, so streamed model chunks are handled with less overhead; it is optional
+    from uvloop import new_event_loop as _new_event_loop
+except ImportError:
+    _new_event_loop = None
+
+try:
+    # orjson serializes tool responses several times faster than the stdlib; it is optional
+    from orjson import dumps as _orjson_dumps
+
+    def _json_dumps(obj: Any) -> str:
+        return _orjson_dumps(obj, default=str).decode()
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, default=str)
+
+# STREAM_OUTPUT=1 prints model tokens as they arrive instead of waiting for each complete response
+STREAM_OUTPUT = os.getenv("STREAM_OUTPUT", "0") == "1"
+RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE if STREAM_OUTPUT else StreamingMode.NONE)
+
+# LOG_LEVEL=DEBUG pretty-prints agent events with rich; otherwise they are written as plain text
+RICH_EVENTS = os.getenv("LOG_LEVEL", "").upper() == "DEBUG"
 
 def reimburse(purpose: str, amount: float) -> dict[str, Any]:
   """Reimburse the amount of money to the employee."""
@@ -31,10 +58,7 @@ def ask_for_approval(
       'ticketId': 'reimbursement-ticket-001',
   }
 
-root_agent = Agent(
-    model='gemini-1.5-flash',
-    name='reimbursement_agent',
-    instruction="""
+REIMBURSEMENT_INSTRUCTION = """
       You are an agent whose job is to handle the reimbursement process for
       the employees. If the amount is less than $100, you will automatically
       approve the reimbursement.
@@ -43,111 +67,211 @@ root_agent = Agent(
       ask for approval from the manager. If the manager approves, you will
       call reimburse() to reimburse the amount to the employee. If the manager
       rejects, you will inform the employee of the rejection.
-    """,
-    tools=[reimburse, LongRunningFunctionTool(func=ask_for_approval)],
-    generate_content_config=types.GenerateContentConfig(temperature=0.1),
-)
+    """
+
+
+@functools.cache
+def get_root_agent() -> Agent:
+    """Build the reimbursement agent on first use; importing the module stays cheap."""
+    return Agent(
+        model='gemini-1.5-flash',
+        name='reimbursement_agent',
+        instruction=REIMBURSEMENT_INSTRUCTION,
+        tools=[reimburse, LongRunningFunctionTool(func=ask_for_approval)],
+        generate_content_config=types.GenerateContentConfig(temperature=0.1),
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # The ADK web UI looks up `root_agent` on the module
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+
+@dataclass(slots=True)
+class PendingApproval:
+    """A long-running approval call awaiting the manager."""
+    call: types.FunctionCall
+    initial_response: Optional[types.FunctionResponse] = None
+    ticket_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class LongRunningState:
+    """The approvals awaiting the manager by function call id, tracked across agent turns."""
+    pending: dict[str, PendingApproval] = field(default_factory=dict)
+
 
+# Set once per run in main(); background tasks inherit it along with the rest of the context
+STATE: ContextVar[LongRunningState] = ContextVar("long_running_state")
 
 
-async def call_agent(message: types.Content, runner: InMemoryRunner,state: dict,  user_id: str, session_id: str) -> None:
+async def call_agent(message: types.Content, runner: InMemoryRunner, user_id: str, session_id: str) -> None:
     """Main function to run the agent."""
-    events = runner.run_async(user_id=user_id, session_id=session_id, new_message=message)
+    state = STATE.get()
+    events = runner.run_async(user_id=user_id, session_id=session_id, new_message=message, run_config=RUN_CONFIG)
 
     # Run the agent
+    streamed = False
     async for event in events:
+        if event.partial:
+            # A chunk of a response that is still being generated; written as is, without rich markup
+            if event.content and event.content.parts and event.content.parts[0].text:
+                sys.stdout.write(event.content.parts[0].text)
+                sys.stdout.flush()
+                streamed = True
+            continue
         if event.content and event.content.parts:
+            # Collected and printed once per event, so rich formats each event a single time
+            lines = []
+            # Already a set on the event; bound once instead of building an empty list per part
+            long_running_ids = event.long_running_tool_ids or frozenset()
             for i, part in enumerate(event.content.parts):
+                # A part carries exactly one of these, so the checks stop at the first match
                 if part.text:
-                    print(f"Part {i} [Text]: {part.text.strip()}")
-                if part.function_call:
-                    print(f"Part {i} [Function Call]: {part.function_call.name} with args {part.function_call.args}")
-                    if part.function_call.id in ( event.long_running_tool_ids or [] ):
-                        print(f"Part {i} [Long Running Tool]: {part.function_call.name} with args {part.function_call.args}")
-                        state["current_long_running_function_call"] = part.function_call
-
-                if part.function_response:
-                    print(f"Part {i} [Function Response]: {part.function_response.response}")
-                    if part.function_response.id == state.get("current_long_running_function_call").id:
-                        state["current_long_running_initial_tool_response"] = part.function_response
-                        if part.function_response:
-                            state["current_long_running_function_ticket_id"] = part.function_response.response.get("ticketId", "unknown")
-                            print(f"Ticket ID: {state['current_long_running_function_ticket_id']}")
-
-
-async def simulate_reimbursement_process(runner: InMemoryRunner, state: dict, user_id: str, session_id: str):
+                    if streamed:
+                        # Already on screen from the partial chunks
+                        sys.stdout.write("\n")
+                        streamed = False
+                    else:
+                        lines.append(f"Part {i} [Text]: {part.text.strip()}")
+                elif function_call := part.function_call:
+                    lines.append(f"Part {i} [Function Call]: {function_call.name} with args {function_call.args}")
+                    if function_call.id in long_running_ids:
+                        lines.append(f"Part {i} [Long Running Tool]: {function_call.name} with args {function_call.args}")
+                        state.pending[function_call.id] = PendingApproval(function_call)
+                elif function_response := part.function_response:
+                    lines.append(f"Part {i} [Function Response]: {_json_dumps(function_response.response)}")
+                    # Only the first response of a pending long-running call carries its ticket
+                    approval = state.pending.get(function_response.id)
+                    if approval is not None and approval.initial_response is None:
+                        approval.initial_response = function_response
+                        approval.ticket_id = function_response.response.get("ticketId", "unknown")
+                        lines.append(f"Ticket ID: {approval.ticket_id}")
+            if lines:
+                if RICH_EVENTS:
+                    print("\n".join(lines))
+                else:
+                    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Agent turns still running in the background; see simulate_reimbursement_process
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def simulate_reimbursement_process(runner: InMemoryRunner, user_id: str, session_id: str):
     """Simulate the reimbursement process with a sample query."""
-    user_feedback = input("Please enter your feedback: ")
-    if user_feedback:
+    state = STATE.get()
+    # Every decision goes back to the agent in one message, so it answers them all in a single turn
+    parts = []
+    for call_id, approval in list(state.pending.items()):
+        # Read in a worker thread so the event loop keeps serving I/O while waiting for the user
+        user_feedback = await asyncio.to_thread(input, f"Please enter your feedback for ticket {approval.ticket_id}: ")
+        if not user_feedback:
+            continue
         print(f"User Feedback: {user_feedback}")
-        if state.get("current_long_running_function_call"):
-            if user_feedback.strip() == "y":
-                    print(f"Approving reimbursement for ticket ID: {state['current_long_running_function_ticket_id']}")
-
-                    updated_tool_output_data = {
-                        "status": "approved",
-                        "ticketId": state["current_long_running_function_ticket_id"],
-                        "approver_feedback": "Approved by manager at " + str(
-                            asyncio.get_event_loop().time()
-                        ),
-                    }
-            else:
-                print(f"Rejecting reimbursement for ticket ID: {state['current_long_running_function_ticket_id']}")
-
-                updated_tool_output_data = {
-                    "status": "rejected",
-                    "ticketId": state["current_long_running_function_ticket_id"],
-                    "approver_feedback": "Rejected by manager at " + str(
-                        asyncio.get_event_loop().time()
-                    ),
-                }
-
-            updated_function_response_part = types.Part(
-                function_response=types.FunctionResponse(
-                    id=state["current_long_running_function_call"].id,
-                    name= state["current_long_running_function_call"].name,
-                    response=updated_tool_output_data,
-                )
-            )
-            await call_agent(
-                types.Content(
-                    parts=[updated_function_response_part], role="user"
-                ),
-                runner=runner,
-                state=state,
-                user_id=user_id,
-                session_id=session_id
+        now = asyncio.get_running_loop().time()
+        if user_feedback.strip() == "y":
+            print(f"Approving reimbursement for ticket ID: {approval.ticket_id}")
+
+            updated_tool_output_data = {
+                "status": "approved",
+                "ticketId": approval.ticket_id,
+                "approver_feedback": f"Approved by manager at {now}",
+            }
+        else:
+            print(f"Rejecting reimbursement for ticket ID: {approval.ticket_id}")
+
+            updated_tool_output_data = {
+                "status": "rejected",
+                "ticketId": approval.ticket_id,
+                "approver_feedback": f"Rejected by manager at {now}",
+            }
+
+        parts.append(types.Part(
+            function_response=types.FunctionResponse(
+                id=approval.call.id,
+                name=approval.call.name,
+                response=updated_tool_output_data,
             )
+        ))
+        del state.pending[call_id]
 
+    if parts:
+        # The agent's answer streams in the background, so the caller can move on to the next request
+        task = asyncio.create_task(call_agent(
+            types.Content(parts=parts, role="user"),
+            runner=runner,
+            user_id=user_id,
+            session_id=session_id
+        ))
+        # The loop only keeps weak references to tasks, so hold on to it until it is done
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+
+async def restore_session(
+    session_service: BaseSessionService, app_name: str, user_id: str, session_id: str, path: Optional[str]
+) -> Session:
+    """Create the session and replay the events a previous run saved to `path`, if any."""
+    session = await session_service.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    if path and os.path.exists(path):
+        # Plain JSON validated back into a Session; unlike a pickle, the file cannot run code when loaded
+        with open(path, "r", encoding="utf-8") as f:
+            saved = Session.model_validate_json(f.read())
+        # Appending the events also applies their state deltas, so the state is rebuilt with them
+        for event in saved.events:
+            await session_service.append_event(session, event)
+    return session
+
+
+async def save_session(
+    session_service: BaseSessionService, app_name: str, user_id: str, session_id: str, path: str
+) -> None:
+    """Save the session to `path`, for restore_session on the next run."""
+    session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    if session is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(session.model_dump_json())
 
 
 async def main() -> None:
-    app_name = os.getenv('APP_NAME', str(uuid.uuid4()))
+    # The random fallback is only generated when APP_NAME is unset
+    app_name = os.getenv('APP_NAME') or os.urandom(8).hex()
     user_id = os.getenv('USER_ID', 'user-123')
     session_id = os.getenv('SESSION_ID', 'session-456')
 
-    runner = InMemoryRunner(agent=root_agent, app_name=app_name)
-    session = await runner.session_service.create_session(
-        app_name=app_name, user_id=user_id, session_id=session_id
-    )
+    # Set SESSION_CACHE_PATH to carry the conversation over to the next run
+    session_cache_path = os.getenv('SESSION_CACHE_PATH')
+
+    runner = InMemoryRunner(agent=get_root_agent(), app_name=app_name)
+    await restore_session(runner.session_service, app_name, user_id, session_id, session_cache_path)
 
-    state = {
-        "current_long_running_function_call": None,
-        "current_long_running_initial_tool_response": None,
-        "current_long_running_function_ticket_id": None,
-    }
+    STATE.set(LongRunningState())
 
     query = "I need to reimburse $150 for office supplies."
     print(f"User Prompt: {query}")
     message = types.Content(role="user", parts=[types.Part(text=query)])
-    await call_agent(message, runner, state, user_id, session_id)
-    # Simulate the reimbursement process
-    await simulate_reimbursement_process(runner, state, user_id, session_id)
+    try:
+        await call_agent(message, runner, user_id, session_id)
+        # Simulate the reimbursement process
+        await simulate_reimbursement_process(runner, user_id, session_id)
+        # Let the agent finish answering before the loop shuts down
+        await asyncio.gather(*_background_tasks)
+    finally:
+        if session_cache_path:
+            await save_session(runner.session_service, app_name, user_id, session_id, session_cache_path)
 
 
 if __name__ == '__main__':
+    # Only the script looks for a .env file; `adk web` loads it itself
+    load_dotenv(find_dotenv())
 
-    asyncio.run(main())
+    with asyncio.Runner(loop_factory=_new_event_loop) as event_loop_runner:
+        event_loop_runner.run(main())
 
     # You can also test with a smaller amount
     # query = "I need to reimburse $50 for lunch."